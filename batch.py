@@ -0,0 +1,335 @@
+"""
+The batch module provides an optional vectorized engine that keeps the
+state of many moving enemies in NumPy arrays (structure of arrays) and
+advances all of them with a few array operations per tick.
+"""
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; enemies then move one by one
+    np = None
+
+
+class BatchView:
+    """
+    A thin view of one entity stored in a BatchEngine
+    """
+    __slots__ = ("__engine", "__slot")
+
+    def __init__(self, engine: "BatchEngine", slot: int):
+        self.__engine = engine
+        self.__slot = slot
+
+    @property
+    def slot(self) -> int:
+        """
+        Get the index of the entity in the engine's arrays
+        """
+        return self.__slot
+
+    def release(self) -> None:
+        """
+        Remove the entity from its engine
+        """
+        self.__engine.remove(self)
+
+    @property
+    def x(self) -> float:
+        """
+        Get or set the x coordinate of the entity
+        """
+        return float(self.__engine.x[self.__slot])
+
+    @x.setter
+    def x(self, val: float) -> None:
+        self.__engine.x[self.__slot] = val
+
+    @property
+    def y(self) -> float:
+        """
+        Get or set the y coordinate of the entity
+        """
+        return float(self.__engine.y[self.__slot])
+
+    @y.setter
+    def y(self, val: float) -> None:
+        self.__engine.y[self.__slot] = val
+
+    @property
+    def heading(self) -> float:
+        """
+        Get or set the heading of the entity in degrees
+        """
+        return float(self.__engine.heading[self.__slot])
+
+    @heading.setter
+    def heading(self, val: float) -> None:
+        self.__engine.heading[self.__slot] = val % 360
+
+    @property
+    def speed(self) -> float:
+        """
+        Get or set the distance the entity moves per tick
+        """
+        return float(self.__engine.speed[self.__slot])
+
+    @speed.setter
+    def speed(self, val: float) -> None:
+        self.__engine.speed[self.__slot] = val
+
+    @property
+    def target(self) -> tuple[float, float]:
+        """
+        Get or set the point a walking entity is heading to
+        """
+        return (float(self.__engine.target_x[self.__slot]),
+                float(self.__engine.target_y[self.__slot]))
+
+    @target.setter
+    def target(self, val: tuple[float, float]) -> None:
+        self.__engine.target_x[self.__slot], self.__engine.target_y[self.__slot] = val
+
+    @property
+    def lod(self) -> tuple[int, int, int]:
+        """
+        Get or set the update interval of the entity in ticks, the tick of
+        its last update and the ticks its last update made up for
+        """
+        engine, slot = self.__engine, self.__slot
+        return (int(engine.interval[slot]), int(engine.last_update[slot]),
+                int(engine.elapsed[slot]))
+
+    @lod.setter
+    def lod(self, val: tuple[int, int, int]) -> None:
+        engine, slot = self.__engine, self.__slot
+        engine.interval[slot], engine.last_update[slot], engine.elapsed[slot] = val
+
+
+class BatchEngine:
+    """
+    Store positions, headings, speeds and sizes of entities in contiguous
+    arrays and move them all at once.  Every entity follows one of the
+    motion kinds below:
+
+    * CHASE - head to the player, or along the flow field toward the player
+      if one is given, then move forward
+    * WALK - move forward until the target is reached, then ask the owner
+      for a new one through its retarget() method; owners reaching their
+      targets in the same tick are asked in the order given by the key
+      function passed to step(), if any, rather than in the arbitrary order
+      of their slots
+    * FENCE - move forward, turning left by 90 degrees whenever leaving the
+      square of the given radius around the anchor point
+    * STRAIGHT - move forward
+
+    Given the tick number, chasing and walking entities farther than the
+    LOD radius from both the player and the anchor point are only moved
+    every LOD interval ticks, by the distance of the ticks elapsed, as
+    enemies moving on their own are; the owners of those moved at the lower
+    rate are asked to redraw through their mark_dirty() method.
+    """
+    CHASE, WALK, FENCE, STRAIGHT = range(4)
+
+    def __init__(self, capacity: int = 64):
+        if np is None:
+            raise RuntimeError("the batch engine requires numpy")
+        self.__size = 0
+        self.__free: list[int] = []
+        self.__owners: list = []
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        # positions before the last step, for swept collision tests
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.heading = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.half_size = np.zeros(capacity)
+        self.radius = np.zeros(capacity)
+        self.target_x = np.zeros(capacity)
+        self.target_y = np.zeros(capacity)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.interval = np.ones(capacity, dtype=np.int64)
+        self.last_update = np.zeros(capacity, dtype=np.int64)
+        self.elapsed = np.ones(capacity, dtype=np.int64)
+        # the aims of the last flow field seen, NaN meaning the player
+        self.__flow_version: tuple | None = None
+        self.__aim_x = np.zeros(0)
+        self.__aim_y = np.zeros(0)
+
+    def __len__(self) -> int:
+        return int(self.alive[:self.__size].sum())
+
+    def __grow(self) -> None:
+        for name in ("x", "y", "prev_x", "prev_y", "heading", "speed", "half_size", "radius",
+                     "target_x", "target_y", "kind", "alive", "interval", "last_update",
+                     "elapsed"):
+            old = getattr(self, name)
+            new = np.zeros(2*len(old), dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, owner, kind: int, x: float, y: float, heading: float,
+            speed: float, size: float, radius: float = 0) -> BatchView:
+        """
+        Store a new entity owned by the given object and return its view
+        """
+        if self.__free:
+            slot = self.__free.pop()
+            self.__owners[slot] = owner
+        else:
+            if self.__size == len(self.x):
+                self.__grow()
+            slot = self.__size
+            self.__size += 1
+            self.__owners.append(owner)
+        self.kind[slot] = kind
+        self.x[slot] = self.prev_x[slot] = x
+        self.y[slot] = self.prev_y[slot] = y
+        self.heading[slot] = heading % 360
+        self.speed[slot] = speed
+        self.half_size[slot] = size/2
+        self.radius[slot] = radius
+        self.target_x[slot] = x
+        self.target_y[slot] = y
+        self.interval[slot] = self.elapsed[slot] = 1
+        self.last_update[slot] = -1
+        self.alive[slot] = True
+        return BatchView(self, slot)
+
+    def remove(self, view: BatchView) -> None:
+        """
+        Release the slot of an entity so that it can be reused
+        """
+        if self.alive[view.slot]:
+            self.alive[view.slot] = False
+            self.__owners[view.slot] = None
+            self.__free.append(view.slot)
+
+    @staticmethod
+    def __entries(x1, y1, x2, y2, bx1, by1, bx2, by2):
+        # slab test of segments against boxes, element-wise: the fractions
+        # of the way at which each segment enters and leaves its box, which
+        # it misses if the first is past the second
+        t_min, t_max = np.zeros(np.shape(x1)), np.ones(np.shape(x1))
+        for start, end, low, high in ((x1, x2, bx1, bx2), (y1, y2, by1, by2)):
+            delta = np.asarray(end - start, dtype=float)
+            still = delta == 0
+            delta[still] = 1
+            t1, t2 = (low - start) / delta, (high - start) / delta
+            near, far = np.minimum(t1, t2), np.maximum(t1, t2)
+            # a motionless axis either always or never overlaps
+            outside = still & ((start < low) | (start > high))
+            near[still], far[still] = -np.inf, np.inf
+            near[outside] = np.inf
+            t_min, t_max = np.maximum(t_min, near), np.minimum(t_max, far)
+        return t_min, t_max
+
+    def __flow_aims(self, flow, x, y, player_x: float, player_y: float):
+        # only chasers whose straight line to the player is blocked need the
+        # field, which is then built if it is not yet
+        blocked = np.zeros(len(x), dtype=bool)
+        target_x, target_y = flow.target
+        for bx1, by1, bx2, by2 in flow.obstacles:
+            t_min, t_max = self.__entries(x, y, target_x, target_y,
+                                          bx1, by1, bx2, by2)
+            blocked |= t_min <= t_max
+        aim_x, aim_y = np.full(len(x), player_x), np.full(len(x), player_y)
+        if not blocked.any():
+            return aim_x, aim_y
+        if self.__flow_version != (id(flow), flow.version):
+            self.__flow_version = (id(flow), flow.version)
+            self.__aim_x = np.array([np.nan if aim is None else aim[0]
+                                     for aim in flow.aims])
+            self.__aim_y = np.array([np.nan if aim is None else aim[1]
+                                     for aim in flow.aims])
+        size = flow.cell_size
+        cols, rows = flow.shape
+        cells = (np.clip(y[blocked] // size, 0, rows-1).astype(int) * cols
+                 + np.clip(x[blocked] // size, 0, cols-1).astype(int))
+        field_x, field_y = self.__aim_x[cells], self.__aim_y[cells]
+        direct = np.isnan(field_x)
+        field_x[direct] = player_x
+        field_y[direct] = player_y
+        aim_x[blocked], aim_y[blocked] = field_x, field_y
+        return aim_x, aim_y
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def step(self, player_x: float, player_y: float,
+             anchor_x: float, anchor_y: float, flow=None, ticks: int | None = None,
+             lod_radius: float = 0, lod_interval: int = 1, order=None) -> None:
+        """
+        Advance every entity by one tick, steering chasing entities with the
+        given FlowField, if any.  Without the tick number, every entity is
+        moved at full rate.
+        """
+        n = self.__size
+        alive = self.alive[:n]
+        kind = self.kind[:n]
+        x, y, heading = self.x[:n], self.y[:n], self.heading[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+
+        due = alive
+        lod = alive & ((kind == self.CHASE) | (kind == self.WALK))
+        if ticks is not None and lod.any():
+            since = ticks - self.last_update[:n]
+            due = alive & ~(lod & (since < self.interval[:n]))
+            updated = due & lod
+            self.elapsed[:n][updated] = since[updated]
+            self.last_update[:n][updated] = ticks
+            radius2 = lod_radius * lod_radius
+            near = (((x - player_x)**2 + (y - player_y)**2 <= radius2)
+                    | ((x - anchor_x)**2 + (y - anchor_y)**2 <= radius2))
+            self.interval[:n][updated] = np.where(near[updated], 1, lod_interval)
+            for slot in np.flatnonzero(updated & (self.interval[:n] != 1)):
+                self.__owners[slot].mark_dirty()
+        speed = self.speed[:n] * self.elapsed[:n]
+
+        chase = due & (kind == self.CHASE)
+        if flow is not None and chase.any():
+            aim_x, aim_y = self.__flow_aims(flow, x[chase], y[chase],
+                                            player_x, player_y)
+        else:
+            aim_x, aim_y = player_x, player_y
+        heading[chase] = np.degrees(np.arctan2(aim_y - y[chase],
+                                               aim_x - x[chase])) % 360
+
+        walk = due & (kind == self.WALK)
+        dist = np.hypot(self.target_x[:n] - x, self.target_y[:n] - y)
+        arrived = [self.__owners[slot] for slot in np.flatnonzero(walk & (dist < speed))]
+        if order is not None and len(arrived) > 1:
+            arrived.sort(key=order)
+        for owner in arrived:
+            owner.retarget()
+
+        fence = alive & (kind == self.FENCE)
+        radius = self.radius[:n]
+        out = fence & ((np.abs(anchor_x - x) > radius) | (np.abs(anchor_y - y) > radius))
+        if out.any():
+            rad = np.radians(heading[out])
+            x[out] -= speed[out] * np.cos(rad)
+            y[out] -= speed[out] * np.sin(rad)
+            heading[out] = (heading[out] + 90) % 360
+
+        rad = np.radians(heading[due])
+        x[due] += speed[due] * np.cos(rad)
+        y[due] += speed[due] * np.sin(rad)
+
+    def sweep_hits(self, px1: float, py1: float,
+                   px2: float, py2: float) -> list[tuple[float, object]]:
+        """
+        Return (time, owner) for every entity whose bounding box met the
+        point moving from (px1, py1) to (px2, py2) during the last step,
+        while the entity moved from its previous position, with the time as
+        the fraction of the step at which they first met
+        """
+        n = self.__size
+        half = self.half_size[:n]
+        # move the point relative to each entity, whose box is then fixed
+        # around the origin
+        t_min, t_max = self.__entries(px1 - self.prev_x[:n], py1 - self.prev_y[:n],
+                                      px2 - self.x[:n], py2 - self.y[:n],
+                                      -half, -half, half, half)
+        met = self.alive[:n] & (t_min <= t_max)
+        return [(float(t_min[slot]), self.__owners[slot])
+                for slot in np.flatnonzero(met)]
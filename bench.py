@@ -0,0 +1,192 @@
+"""
+The bench module runs scripted headless scenarios of the game for a fixed
+number of ticks, reports their performance, and compares the results with a
+saved baseline to catch slowdowns.
+
+Usage: python bench.py [--ticks N] [--save] [--baseline FILE] [--threshold F]
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import resource
+import sys
+import time
+from typing import Callable
+from main import SCREEN_WIDTH, SCREEN_HEIGHT
+from turtle_adventure import (MAX_LEVEL, TurtleAdventureGame, ChaseEnemy,
+                              SentryGun)
+
+DEFAULT_BASELINE = "bench_baseline.json"
+
+
+class BenchGame(TurtleAdventureGame): # pylint: disable=too-many-ancestors
+    """
+    A headless game that keeps running whatever happens to the player, so
+    that every scenario runs for the same number of ticks
+    """
+
+    BULLET_POOL_CAPACITY = 4096
+
+    def __init__(self, level: int = 0):
+        super().__init__(None, SCREEN_WIDTH, SCREEN_HEIGHT, level=level,
+                         headless=True, seed=level)
+
+    def game_over_win(self) -> None:
+        pass
+
+    def game_over_lose(self) -> None:
+        pass
+
+
+def level(num: int) -> Callable[[], BenchGame]:
+    """
+    Build a scenario running the given level
+    """
+    return lambda: BenchGame(level=num)
+
+
+def chasers(count: int) -> Callable[[], BenchGame]:
+    """
+    Build a scenario with the given number of chasing enemies
+    """
+    def build():
+        game = BenchGame()
+        for _ in range(count):
+            game.add_enemy(ChaseEnemy(game))
+        return game
+    return build
+
+
+def sentry_guns(count: int, interval: float = 1.5) -> Callable[[], BenchGame]:
+    """
+    Build a scenario with the given number of sentry guns firing every
+    interval seconds
+    """
+    def build():
+        game = BenchGame()
+        for _ in range(count):
+            game.add_enemy(SentryGun(game, max_bullets=1000, interval=interval))
+        return game
+    return build
+
+
+SCENARIOS: dict[str, Callable[[], BenchGame]] = {
+    **{f"level-{num}": level(num) for num in range(MAX_LEVEL)},
+    "chasers-50": chasers(50),
+    "chasers-200": chasers(200),
+    "sentry-guns-10": sentry_guns(10),
+    "bullet-storm": sentry_guns(20, interval=0.1),
+}
+
+
+def run_scenario(name: str, ticks: int) -> dict:
+    """
+    Run one scenario for the given number of ticks and return its results
+    """
+    random.seed(name)
+    game = SCENARIOS[name]()
+    game.start()
+    game.step()  # let the game run its first frame
+    frame_times = []
+    max_items = 0
+    start = time.perf_counter()
+    for i in range(ticks):
+        if i % 60 == 0:
+            # move the player around like someone clicking the canvas
+            game.canvas.event_generate("<Button-1>",
+                                       x=random.randint(0, SCREEN_WIDTH),
+                                       y=random.randint(0, SCREEN_HEIGHT))
+        frame_start = time.perf_counter()
+        game.step()
+        frame_times.append((time.perf_counter() - frame_start) * 1000)
+        if i % 50 == 0:
+            max_items = max(max_items, len(game.canvas.find_all()))
+    elapsed = time.perf_counter() - start
+    frame_times.sort()
+    return {
+        "ticks_per_sec": ticks / elapsed,
+        "mean_ms": sum(frame_times) / ticks,
+        "p95_ms": frame_times[int(ticks * 0.95)],
+        "p99_ms": frame_times[int(ticks * 0.99)],
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "canvas_items": max_items,
+    }
+
+
+def run_all(ticks: int) -> dict[str, dict]:
+    """
+    Run every scenario in a fresh process, so that the peak memory of one
+    scenario does not hide that of the next
+    """
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for name in SCENARIOS:
+            results[name] = pool.apply(run_scenario, (name, ticks))
+    return results
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict],
+            threshold: float) -> list[str]:
+    """
+    Return a description of every scenario that regressed by more than the
+    threshold (a fraction) in ticks per second or mean frame time
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["ticks_per_sec"] < base["ticks_per_sec"] * (1 - threshold):
+            regressions.append(f"{name}: {result['ticks_per_sec']:.0f} ticks/s,"
+                               f" baseline {base['ticks_per_sec']:.0f}")
+        if result["mean_ms"] > base["mean_ms"] * (1 + threshold):
+            regressions.append(f"{name}: mean frame {result['mean_ms']:.3f} ms,"
+                               f" baseline {base['mean_ms']:.3f}")
+    return regressions
+
+
+def main() -> int:
+    """
+    Run the benchmark from the command line and return the exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ticks", type=int, default=600,
+                        help="number of ticks per scenario")
+    parser.add_argument("--save", action="store_true",
+                        help="save the results as the new baseline")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="baseline file to compare with or save to")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown as a fraction of the baseline")
+    args = parser.parse_args()
+
+    results = run_all(args.ticks)
+    print(f"{'scenario':<16}{'ticks/s':>10}{'mean ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'rss kB':>10}{'items':>8}")
+    for name, result in results.items():
+        print(f"{name:<16}{result['ticks_per_sec']:>10.0f}"
+              f"{result['mean_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+              f"{result['p99_ms']:>10.3f}{result['peak_rss_kb']:>10}"
+              f"{result['canvas_items']:>8}")
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    try:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        print(f"no baseline at {args.baseline}; run with --save to create one")
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print("REGRESSION", regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,13 @@
 """
-The main module, responsible for creating a root window containing the game's
-main component.
+The debug module starts the game like the main module, with the frame
+profiler shown on the canvas and its report written to profile.json when the
+game stops.  The session is recorded to session.rec for replay.py, and any
+leaked canvas item or turtle is listed when the window is closed.
 """
 from typing import Final
 import tkinter as tk
 from turtle_adventure import TurtleAdventureGame
+from replay import Recorder
 
 SCREEN_WIDTH: Final = 800
 SCREEN_HEIGHT: Final = 500
@@ -15,7 +18,10 @@ if __name__ == "__main__":
     root.geometry(f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}")
     root.resizable(False, False) # games usually have fixed window size
     game = TurtleAdventureGame(root, SCREEN_WIDTH, SCREEN_HEIGHT, level=1)
+    game.enable_profiler(overlay=True, path="profile.json")
+    Recorder(game, "session.rec")
     game.start()
     root.mainloop()
+    print(game.leak_report())
 
 
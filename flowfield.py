@@ -0,0 +1,204 @@
+"""
+The flowfield module provides a grid-based flow field toward a moving
+target, computed once and shared by every element heading to the target,
+e.g., all chasing enemies, which then look up their direction in O(1).
+"""
+import heapq
+import math
+from spatial import segment_entry
+
+NEIGHBORS = [(dc, dr, math.hypot(dc, dr))
+             for dc in (-1, 0, 1) for dr in (-1, 0, 1) if dc or dr]
+
+
+class FlowField:
+    """
+    Keep, for every cell of a uniform grid covering the screen, the point an
+    element in that cell should head to in order to reach the target along
+    a shortest path around the obstacles.  The field is rebuilt only when
+    it is used after the target has moved to another cell or the obstacles
+    have changed, so an unused field costs nothing.
+
+    An element with a clear line to the target heads straight to it, as if
+    there were no field, so the field is only built, and rebuilt, while an
+    obstacle is actually in the way of some element.
+    """
+
+    def __init__(self, width: float, height: float, cell_size: float = 20):
+        self.__cell_size: float = cell_size
+        self.__cols: int = max(1, math.ceil(width / cell_size))
+        self.__rows: int = max(1, math.ceil(height / cell_size))
+        self.__obstacles: list[tuple[float, float, float, float]] = []
+        self.__blocked: list[bool] = [False] * (self.__cols * self.__rows)
+        # per cell, the point to head to, or None for the target itself
+        self.__aims: list[tuple[float, float] | None] = [None] * len(self.__blocked)
+        self.__target: tuple[float, float] = (0, 0)
+        self.__target_cell: int | None = None
+        self.__built_cell: int | None = None
+        self.__version: int = 0
+
+    @property
+    def cell_size(self) -> float:
+        """
+        Get the width and height of each grid cell
+        """
+        return self.__cell_size
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """
+        Get the number of columns and rows of the grid
+        """
+        return self.__cols, self.__rows
+
+    @property
+    def version(self) -> int:
+        """
+        Get a number that changes whenever the field is rebuilt
+        """
+        self.__build()
+        return self.__version
+
+    @property
+    def target(self) -> tuple[float, float]:
+        """
+        Get the target of the field
+        """
+        return self.__target
+
+    @property
+    def obstacles(self) -> list[tuple[float, float, float, float]]:
+        """
+        Get the obstacle boxes, grown by their margins, as (x1, y1, x2, y2)
+        """
+        return self.__obstacles
+
+    @property
+    def aims(self) -> list[tuple[float, float] | None]:
+        """
+        Get the point to head to for every cell, in row-major order, with
+        None meaning the target itself
+        """
+        self.__build()
+        return self.__aims
+
+    def cell(self, x: float, y: float) -> int:
+        """
+        Return the index of the cell containing the point (x, y), clamped
+        to the grid
+        """
+        size = self.__cell_size
+        col = min(max(int(x // size), 0), self.__cols - 1)
+        row = min(max(int(y // size), 0), self.__rows - 1)
+        return row * self.__cols + col
+
+    def add_obstacle(self, x1: float, y1: float, x2: float, y2: float,
+                     margin: float = 0) -> None:
+        """
+        Keep paths out of the box (x1, y1)-(x2, y2) grown by the margin on
+        every side, e.g., half the size of the elements using the field
+        """
+        box = (x1 - margin, y1 - margin, x2 + margin, y2 + margin)
+        self.__obstacles.append(box)
+        size, cols = self.__cell_size, self.__cols
+        col1, row1 = int(max(box[0], 0) // size), int(max(box[1], 0) // size)
+        col2 = min(int(box[2] // size), cols - 1)
+        row2 = min(int(box[3] // size), self.__rows - 1)
+        for row in range(row1, row2+1):
+            for col in range(col1, col2+1):
+                self.__blocked[row * cols + col] = True
+        self.__built_cell = None
+
+    def clear_obstacles(self) -> None:
+        """
+        Remove every obstacle
+        """
+        self.__obstacles.clear()
+        self.__blocked = [False] * len(self.__blocked)
+        self.__built_cell = None
+
+    def clear_line(self, x1: float, y1: float, x2: float, y2: float) -> bool:
+        """
+        Check whether the segment (x1, y1)-(x2, y2) misses every obstacle
+        """
+        low_x, high_x = (x1, x2) if x1 <= x2 else (x2, x1)
+        low_y, high_y = (y1, y2) if y1 <= y2 else (y2, y1)
+        for box in self.__obstacles:
+            # most segments are nowhere near the obstacle
+            if (high_x < box[0] or low_x > box[2]
+                    or high_y < box[1] or low_y > box[3]):
+                continue
+            if segment_entry(x1, y1, x2, y2, *box) is not None:
+                return False
+        return True
+
+    def retarget(self, target_x: float, target_y: float) -> None:
+        """
+        Make (target_x, target_y) the target of the field
+        """
+        self.__target = (target_x, target_y)
+        self.__target_cell = self.cell(target_x, target_y)
+
+    def __build(self) -> None:
+        target = self.__target_cell
+        if target is None or target == self.__built_cell:
+            return
+        self.__built_cell = target
+        self.__version += 1
+        target_x, target_y = self.__target
+        cols, rows, size = self.__cols, self.__rows, self.__cell_size
+        blocked = self.__blocked
+        count = len(blocked)
+        aims: list[tuple[float, float] | None] = [None] * count
+        dist = [math.inf] * count
+        parents = [target] * count
+        settled = bytearray(count)
+        dist[target] = 0
+        queue = [(0.0, target)]
+        while queue:
+            cost, index = heapq.heappop(queue)
+            if settled[index]:
+                continue
+            settled[index] = 1
+            row, col = divmod(index, cols)
+            if index != target:
+                # aim as far along the path as can be seen from the cell
+                parent = parents[index]
+                parent_aim = aims[parent]
+                aim_x, aim_y = parent_aim if parent_aim is not None else (target_x, target_y)
+                if self.clear_line((col + 0.5) * size, (row + 0.5) * size,
+                                     aim_x, aim_y):
+                    aims[index] = parent_aim
+                else:
+                    prow, pcol = divmod(parent, cols)
+                    aims[index] = ((pcol + 0.5) * size, (prow + 0.5) * size)
+            for dc, dr, step in NEIGHBORS:
+                ncol, nrow = col + dc, row + dr
+                if not (0 <= ncol < cols and 0 <= nrow < rows):
+                    continue
+                neighbor = nrow * cols + ncol
+                # no cutting corners of blocked cells
+                if (settled[neighbor] or blocked[neighbor]
+                        or blocked[row * cols + ncol] or blocked[nrow * cols + col]):
+                    continue
+                if cost + step < dist[neighbor]:
+                    dist[neighbor] = cost + step
+                    parents[neighbor] = index
+                    heapq.heappush(queue, (cost + step, neighbor))
+        self.__aims = aims
+
+    def aim(self, x: float, y: float) -> tuple[float, float] | None:
+        """
+        Return the point an element at (x, y) should head to, or None if it
+        should head straight to the target
+        """
+        target_x, target_y = self.__target
+        if self.clear_line(x, y, target_x, target_y):
+            return None
+        if self.__target_cell != self.__built_cell:
+            self.__build()
+        size = self.__cell_size
+        col, row = int(x // size), int(y // size)
+        if 0 <= col < self.__cols and 0 <= row < self.__rows:
+            return self.__aims[row * self.__cols + col]
+        return self.__aims[self.cell(x, y)]
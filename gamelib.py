@@ -2,9 +2,19 @@
 The gamelib module defines abstract classes necessary for implementing simple
 games based on tkinter's canvas.
 """
+import math
+import operator
+import queue
+import threading
+import time
 import tkinter as tk
 import turtle
 from abc import ABC, abstractmethod
+from typing import Callable
+from headless import CanvasMirror, HeadlessCanvas, HeadlessScreen, VirtualClock
+from profiler import FrameProfiler
+from scheduler import TickScheduler
+from shapes import ShapeCache
 
 
 class GameElement(ABC):
@@ -17,6 +27,9 @@ class GameElement(ABC):
         self.__game: "Game" = game
         self.__x: float = 0
         self.__y: float = 0
+        self.__dirty: bool = True
+        # position at the start of the current tick, for interpolation
+        self.__previous: tuple[float, float] | None = None
 
     @property
     def x(self) -> float:
@@ -28,6 +41,7 @@ class GameElement(ABC):
     @x.setter
     def x(self, val: float) -> None:
         self.__x = val
+        self.mark_dirty()
 
     @property
     def y(self) -> float:
@@ -39,6 +53,68 @@ class GameElement(ABC):
     @y.setter
     def y(self, val: float) -> None:
         self.__y = val
+        self.mark_dirty()
+
+    @property
+    def is_dirty(self) -> bool:
+        """
+        Get the flag indicating whether the element has changed since it
+        was last rendered
+        """
+        return self.__dirty
+
+    def mark_dirty(self) -> None:
+        """
+        Ask the game to render the element in the next frame
+        """
+        self.__dirty = True
+
+    def mark_clean(self) -> None:
+        """
+        Record that the element has been rendered with its current state
+        """
+        self.__dirty = False
+
+    def save_state(self) -> None:
+        """
+        Record the current position as the previous state, from which the
+        element is interpolated while the next tick has not run yet.  The
+        game calls this at the start of every tick when it interpolates;
+        call it after teleporting the element so that it is not drawn
+        sliding from its old position.
+        """
+        self.__previous = (self.x, self.y)
+
+    @property
+    def previous_position(self) -> tuple[float, float]:
+        """
+        Get the position recorded by save_state(), or the current position
+        if none has been recorded
+        """
+        if self.__previous is None:
+            return self.x, self.y
+        return self.__previous
+
+    @property
+    def is_moving(self) -> bool:
+        """
+        Get the flag indicating whether the element has moved since its
+        previous state was saved
+        """
+        return self.__previous is not None and self.__previous != (self.x, self.y)
+
+    @property
+    def render_position(self) -> tuple[float, float]:
+        """
+        Get the position to draw the element at, i.e., between its previous
+        and current positions by the game's interpolation factor
+        """
+        x, y = self.x, self.y
+        alpha = self.__game.alpha
+        if alpha >= 1 or self.__previous is None:
+            return x, y
+        prev_x, prev_y = self.__previous
+        return prev_x + (x - prev_x)*alpha, prev_y + (y - prev_y)*alpha
 
     @property
     def game(self) -> "Game":
@@ -54,6 +130,21 @@ class GameElement(ABC):
         """
         return self.game.canvas
 
+    def request_redraw(self) -> None:
+        """
+        Ask the game to refresh the turtle screen at the end of the current
+        frame, instead of forcing a refresh right away
+        """
+        self.game.request_redraw(self)
+
+    def track(self, resource):
+        """
+        Register a canvas item id, RawTurtle or Sprite created by this
+        element, so that the game frees it when the element is removed, and
+        return the resource
+        """
+        return self.game.track(self, resource)
+
     @abstractmethod
     def create(self) -> None:
         """
@@ -79,20 +170,604 @@ class GameElement(ABC):
         """
 
 
+class Sprite:
+    """
+    A lightweight replacement of RawTurtle that draws a single canvas item,
+    an oval for the "circle" shape or a polygon for other turtle shapes, and
+    moves it with one canvas.coords() call per redraw.  It supports the
+    subset of the turtle API used by game elements, in the world coordinates
+    of the given turtle screen.  Polygons turned to a heading come from a
+    cache shared by all sprites.
+    """
+
+    CIRCLE_RADIUS = 10
+    shape_cache: ShapeCache = ShapeCache()
+
+    def __init__(self, canvas: tk.Canvas, screen: turtle.TurtleScreen):
+        self.__canvas = canvas
+        self.__screen = screen
+        self.__x: float = 0
+        self.__y: float = 0
+        self.__heading: float = 0
+        self.__shape: str = ""
+        self.__points: list[tuple[float, float]] = []
+        self.__item: int | None = None
+        self.__pencolor: str = "black"
+        self.__fillcolor: str = "black"
+        self.__pensize: float = 1
+        self.__pendown: bool = True
+        self.__visible: bool = True
+        self.__lines: list[int] = []
+        self.__moved: bool = True
+        self.__restyled: bool = True
+        self.shape("classic")
+
+    @property
+    def screen(self) -> turtle.TurtleScreen:
+        """
+        Get the turtle screen whose coordinates the sprite uses
+        """
+        return self.__screen
+
+    def getscreen(self) -> turtle.TurtleScreen:
+        """
+        Return the turtle screen whose coordinates the sprite uses
+        """
+        return self.__screen
+
+    def shape(self, name: str | None = None):
+        """
+        Set the shape to one of the turtle screen's polygon shapes, or return
+        the current shape name
+        """
+        if name is None:
+            return self.__shape
+        if self.__item is not None:
+            self.__canvas.delete(self.__item)
+        self.__shape = name
+        if name == "circle":
+            self.__item = self.__canvas.create_oval(0, 0, 0, 0)
+        else:
+            # pylint: disable-next=protected-access
+            self.__points = list(self.__screen._shapes[name]._data)
+            self.__item = self.__canvas.create_polygon(0, 0, 0, 0, 0, 0)
+        self.__moved = self.__restyled = True
+        return None
+
+    def xcor(self) -> float:
+        """
+        Return the x coordinate
+        """
+        return self.__x
+
+    def ycor(self) -> float:
+        """
+        Return the y coordinate
+        """
+        return self.__y
+
+    def pos(self) -> tuple[float, float]:
+        """
+        Return the position as (x, y)
+        """
+        return (self.__x, self.__y)
+
+    def heading(self) -> float:
+        """
+        Return the heading in degrees
+        """
+        return self.__heading
+
+    def setheading(self, angle: float) -> None:
+        """
+        Set the heading in degrees
+        """
+        self.__heading = angle % 360
+        self.__moved = True
+
+    def left(self, angle: float) -> None:
+        """
+        Turn counterclockwise by angle degrees
+        """
+        self.setheading(self.__heading + angle)
+
+    def right(self, angle: float) -> None:
+        """
+        Turn clockwise by angle degrees
+        """
+        self.setheading(self.__heading - angle)
+
+    def goto(self, x, y: float | None = None) -> None:
+        """
+        Move to (x, y), drawing a line if the pen is down
+        """
+        if y is None:
+            x, y = x
+        if self.__pendown:
+            scale_x, scale_y = self.__screen.xscale, self.__screen.yscale
+            self.__lines.append(self.__canvas.create_line(
+                self.__x*scale_x, -self.__y*scale_y, x*scale_x, -y*scale_y,
+                fill=self.__pencolor, width=self.__pensize, capstyle="round"))
+        self.__x, self.__y = x, y
+        self.__moved = True
+
+    def setx(self, x: float) -> None:
+        """
+        Set the x coordinate
+        """
+        self.goto(x, self.__y)
+
+    def sety(self, y: float) -> None:
+        """
+        Set the y coordinate
+        """
+        self.goto(self.__x, y)
+
+    def forward(self, distance: float) -> None:
+        """
+        Move forward by the given distance
+        """
+        rad = math.radians(self.__heading)
+        self.goto(self.__x + distance*math.cos(rad),
+                  self.__y + distance*math.sin(rad))
+
+    def back(self, distance: float) -> None:
+        """
+        Move backward by the given distance
+        """
+        self.forward(-distance)
+
+    def towards(self, x, y: float | None = None) -> float:
+        """
+        Return the heading in degrees from the sprite to (x, y)
+        """
+        if y is None:
+            x, y = x
+        return round(math.degrees(math.atan2(y - self.__y, x - self.__x)), 10) % 360
+
+    def distance(self, x, y: float | None = None) -> float:
+        """
+        Return the distance from the sprite to (x, y)
+        """
+        if y is None:
+            x, y = x
+        return math.hypot(x - self.__x, y - self.__y)
+
+    def color(self, *args):
+        """
+        Set both pen and fill colors, set them separately if two colors are
+        given, or return both
+        """
+        if not args:
+            return (self.__pencolor, self.__fillcolor)
+        self.__pencolor = args[0]
+        self.__fillcolor = args[-1]
+        self.__restyled = True
+        return None
+
+    def pencolor(self, color: str | None = None):
+        """
+        Set or return the color of the outline and of drawn lines
+        """
+        if color is None:
+            return self.__pencolor
+        self.__pencolor = color
+        self.__restyled = True
+        return None
+
+    def fillcolor(self, color: str | None = None):
+        """
+        Set or return the fill color
+        """
+        if color is None:
+            return self.__fillcolor
+        self.__fillcolor = color
+        self.__restyled = True
+        return None
+
+    def pensize(self, width: float | None = None):
+        """
+        Set or return the width of drawn lines
+        """
+        if width is None:
+            return self.__pensize
+        self.__pensize = width
+        return None
+
+    def penup(self) -> None:
+        """
+        Stop drawing lines when moving
+        """
+        self.__pendown = False
+
+    def pendown(self) -> None:
+        """
+        Draw lines when moving
+        """
+        self.__pendown = True
+
+    def isdown(self) -> bool:
+        """
+        Return whether lines are drawn when moving
+        """
+        return self.__pendown
+
+    def hideturtle(self) -> None:
+        """
+        Make the sprite invisible
+        """
+        self.__visible = False
+        self.__restyled = True
+
+    def showturtle(self) -> None:
+        """
+        Make the sprite visible
+        """
+        self.__visible = True
+        self.__restyled = True
+
+    def isvisible(self) -> bool:
+        """
+        Return whether the sprite is visible
+        """
+        return self.__visible
+
+    def clear(self) -> None:
+        """
+        Delete the lines drawn by the sprite
+        """
+        if self.__lines:
+            self.__canvas.delete(*self.__lines)
+            self.__lines = []
+
+    def draw(self) -> None:
+        """
+        Send the changes made since the last call to the canvas
+        """
+        canvas = self.__canvas
+        if self.__restyled:
+            canvas.itemconfigure(self.__item,
+                                 fill=self.__fillcolor,
+                                 outline=self.__pencolor,
+                                 state="normal" if self.__visible else "hidden")
+            self.__restyled = False
+        if self.__moved:
+            screen = self.__screen
+            x, y = self.__x*screen.xscale, -self.__y*screen.yscale
+            if self.__shape == "circle":
+                radius = self.CIRCLE_RADIUS
+                canvas.coords(self.__item, x-radius, y-radius, x+radius, y+radius)
+            else:
+                offsets = self.shape_cache.offsets(self.__shape, self.__points,
+                                                   self.__heading,
+                                                   screen.yscale/screen.xscale)
+                canvas.coords(self.__item,
+                              *map(operator.add, offsets, (x, y) * (len(offsets)//2)))
+            canvas.tag_raise(self.__item)
+            self.__moved = False
+
+    def items(self) -> list[int]:
+        """
+        Return the ids of all canvas items of the sprite
+        """
+        if self.__item is None:
+            return list(self.__lines)
+        return [self.__item, *self.__lines]
+
+    def delete(self) -> None:
+        """
+        Delete the canvas item and the lines drawn by the sprite
+        """
+        self.clear()
+        if self.__item is not None:
+            self.__canvas.delete(self.__item)
+            self.__item = None
+
+
+class Pool:
+    """
+    A bounded pool of reusable objects, e.g., elements whose turtles and
+    canvas items are expensive to create and should be recycled instead of
+    being thrown away
+    """
+
+    def __init__(self, factory: Callable[[], object], capacity: int):
+        self.__factory = factory
+        self.__capacity: int = capacity
+        self.__free: list = []
+        self.__in_use: int = 0
+        self.__high_water: int = 0
+        self.__allocations: int = 0
+        self.__reuses: int = 0
+
+    @property
+    def capacity(self) -> int:
+        """
+        Get the maximum number of objects the pool will ever create
+        """
+        return self.__capacity
+
+    @property
+    def in_use(self) -> int:
+        """
+        Get the number of objects currently acquired
+        """
+        return self.__in_use
+
+    def acquire(self):
+        """
+        Return a free object, creating one if none is free and the capacity
+        allows it, or None if the pool is exhausted
+        """
+        if self.__free:
+            obj = self.__free.pop()
+            self.__reuses += 1
+        elif self.__allocations < self.__capacity:
+            obj = self.__factory()
+            self.__allocations += 1
+        else:
+            return None
+        self.__in_use += 1
+        self.__high_water = max(self.__high_water, self.__in_use)
+        return obj
+
+    def release(self, obj) -> None:
+        """
+        Give an acquired object back to the pool
+        """
+        self.__in_use -= 1
+        self.__free.append(obj)
+
+    def drain(self) -> list:
+        """
+        Remove and return every free object, e.g., to delete them for good
+        """
+        free, self.__free = self.__free, []
+        return free
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Get the capacity, the number of objects in use, the highest number of
+        objects ever in use at once, the number of objects created and the
+        number of creations avoided by reusing free objects
+        """
+        return {
+            "capacity": self.__capacity,
+            "in_use": self.__in_use,
+            "high_water": self.__high_water,
+            "allocations": self.__allocations,
+            "allocations_avoided": self.__reuses,
+        }
+
+
+class EntityStore:
+    """
+    Keep game elements in a dense list with O(1) insertion and swap-remove
+    deletion, so the order of the elements changes as they are removed.
+    Every element gets a handle that stays valid until it is removed, and
+    typed views list the elements of a class kept up to date the same way.
+
+    While removals are deferred, remove() only marks the element, which
+    stays in the store, e.g., so that the elements can be iterated over
+    while one of them removes itself, until flush() is called.
+    """
+
+    def __init__(self):
+        self.__elements: list = []
+        self.__positions: dict[object, int] = {}
+        self.__handles: dict[object, int] = {}
+        self.__by_handle: dict[int, object] = {}
+        self.__next_handle: int = 1
+        # (class, excluded class) -> (elements, positions)
+        self.__views: dict[tuple, tuple[list, dict]] = {}
+        self.__deferring: bool = False
+        self.__pending: dict[object, None] = {}
+
+    def __len__(self) -> int:
+        return len(self.__elements)
+
+    def __iter__(self):
+        return iter(self.__elements)
+
+    def __contains__(self, element) -> bool:
+        return element in self.__positions and element not in self.__pending
+
+    @staticmethod
+    def __matches(key: tuple, element) -> bool:
+        cls, exclude = key
+        return isinstance(element, cls) and not (exclude is not None
+                                                 and isinstance(element, exclude))
+
+    @staticmethod
+    def __swap_remove(elements: list, positions: dict, element) -> None:
+        pos = positions.pop(element)
+        last = elements.pop()
+        if last is not element:
+            elements[pos] = last
+            positions[last] = pos
+
+    def add(self, element) -> int:
+        """
+        Add an element, or keep one whose removal is pending, and return its
+        handle
+        """
+        if element in self.__positions:
+            self.__pending.pop(element, None)
+            return self.__handles[element]
+        handle = self.__next_handle
+        self.__next_handle += 1
+        self.__positions[element] = len(self.__elements)
+        self.__elements.append(element)
+        self.__handles[element] = handle
+        self.__by_handle[handle] = element
+        for key, (elements, positions) in self.__views.items():
+            if self.__matches(key, element):
+                positions[element] = len(elements)
+                elements.append(element)
+        return handle
+
+    def remove(self, element) -> None:
+        """
+        Remove an element right away, or at the next flush() while removals
+        are deferred
+        """
+        if element not in self.__positions:
+            return
+        if self.__deferring:
+            self.__pending[element] = None
+            return
+        self.__swap_remove(self.__elements, self.__positions, element)
+        del self.__by_handle[self.__handles.pop(element)]
+        for elements, positions in self.__views.values():
+            if element in positions:
+                self.__swap_remove(elements, positions, element)
+
+    def defer_removals(self) -> None:
+        """
+        Hold removals until flush() is called
+        """
+        self.__deferring = True
+
+    @property
+    def is_deferring(self) -> bool:
+        """
+        Get the flag indicating whether removals are held until flush()
+        """
+        return self.__deferring
+
+    @property
+    def pending(self) -> list:
+        """
+        Get the elements whose removal is held until the next flush()
+        """
+        return list(self.__pending)
+
+    def flush(self) -> None:
+        """
+        Carry out the held removals and stop deferring them
+        """
+        self.__deferring = False
+        pending, self.__pending = self.__pending, {}
+        for element in pending:
+            self.remove(element)
+
+    def clear(self) -> None:
+        """
+        Remove every element right away
+        """
+        self.__elements.clear()
+        self.__positions.clear()
+        self.__handles.clear()
+        self.__by_handle.clear()
+        self.__pending.clear()
+        for elements, positions in self.__views.values():
+            elements.clear()
+            positions.clear()
+
+    def handle(self, element) -> int | None:
+        """
+        Get the handle of an element, or None if it is not in the store
+        """
+        return self.__handles.get(element)
+
+    def index(self, element) -> int:
+        """
+        Get the position of an element in the iteration order, which is the
+        order the game updates its elements in
+        """
+        return self.__positions[element]
+
+    def get(self, handle: int):
+        """
+        Get the element with the given handle, or None if it has been removed
+        """
+        return self.__by_handle.get(handle)
+
+    def view(self, cls: type, exclude: type | None = None) -> list:
+        """
+        Get the live list of elements that are instances of cls but not of
+        exclude.  The list is kept up to date as elements are added and
+        removed, and must not be modified.
+        """
+        key = (cls, exclude)
+        if key not in self.__views:
+            elements = [element for element in self.__elements
+                        if self.__matches(key, element)]
+            self.__views[key] = (elements, {element: pos for pos, element
+                                            in enumerate(elements)})
+        return self.__views[key][0]
+
+
 class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
     """
     An abstract class to be implemented with a concrete game class that relies
     on update/render loop
+
+    A threaded game runs its elements on a worker thread, drawing on an
+    in-memory canvas whose snapshot is published after every tick, while the
+    Tk thread only copies the latest snapshot to the window and passes the
+    events bound to the canvas back to the worker.
+
+    With a frame_delay shorter than the update_delay, the game renders more
+    often than it ticks, drawing every element between its positions before
+    and after the last tick, so that a low simulation rate still gives
+    smooth motion.
+
+    The previous state of every element is saved at the start of each tick
+    when the game interpolates, or when save_previous_states is True, e.g.,
+    for collision tests along the path of elements during the tick.
     """
 
-    def __init__(self, parent, update_delay=33):
-        super().__init__(parent)
-        self.__canvas = tk.Canvas(self)
-        self.__canvas.pack(expand=True, fill="both")
-        self.pack(expand=True, fill="both")
-        self.__game_elements = []
+    save_previous_states: bool = False
+
+    def __init__(self, parent, update_delay=33, headless=False, max_catch_up=5,
+                 threaded=False, frame_delay=None):
+        self.__headless = headless
+        self.__threaded = threaded and not headless
+        # canvas and timers of the game live in memory
+        self.__in_memory = headless or threaded
+        self.__display = None
+        if self.__in_memory:
+            self.__clock = VirtualClock()
+            self.__canvas = HeadlessCanvas()
+        if not headless:
+            super().__init__(parent)
+            self.__display = tk.Canvas(self)
+            self.__display.pack(expand=True, fill="both")
+            self.pack(expand=True, fill="both")
+            if not self.__threaded:
+                self.__canvas = self.__display
+        self.__worker: threading.Thread | None = None
+        self.__closing = False
+        self.__snapshot: tuple | None = None
+        self.__inputs: queue.SimpleQueue = queue.SimpleQueue()
+        self.__input_latency: float = 0
+        self.__screen = None
+        self.__screen_items: set[int] = set()
+        self.__resources: dict[object, set] = {}
+        self.__redraw_requests: set[GameElement] = set()
+        self.__entities = EntityStore()
+        self.__doomed: list[GameElement] = []
         self.__update_delay = update_delay
+        self.__frame_delay = min(frame_delay or update_delay, update_delay)
+        # threaded games render once per tick on the worker
+        self.__interpolate = (self.__frame_delay < update_delay
+                              and not self.__threaded)
+        self.__alpha: float = 1
+        self.__max_catch_up = max_catch_up
         self.__started = False
+        self.__ticks = 0
+        self.__scheduler = TickScheduler()
+        self.__accumulator: float = 0
+        self.__last_frame: float = 0
+        self.__frames_skipped = 0
+        self.__skip_streak = 0
+        self.__after_id = None
+        self.__run = 0
+        self.__profiler: FrameProfiler | None = None
+        self.__profile_overlay = False
+        self.__profile_path: str | None = None
         self.init_game()
 
     @abstractmethod
@@ -113,27 +788,282 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
         Get called when the player loses the game
         """
 
-    def add_element(self, element: GameElement) -> None:
+    @property
+    def entities(self) -> EntityStore:
+        """
+        Get the store of all game's elements
         """
-        Add a GameElement object to the game
+        return self.__entities
+
+    def add_element(self, element: GameElement) -> int:
+        """
+        Add a GameElement object to the game and return its handle
         """
         element.create()
-        self.__game_elements.append(element)
+        return self.__entities.add(element)
 
     def delete_element(self, element: GameElement) -> None:
         """
-        Remove a GameElement object to the game
+        Remove a GameElement object to the game, freeing every resource it
+        has registered with track().  During the update phase of a tick, the
+        element is deleted at the end of the phase instead.
         """
-        element.delete()
-        self.__game_elements.remove(element)
+        if self.__entities.is_deferring:
+            self.__doomed.append(element)
+        else:
+            element.delete()
+            self.free(element)
+        self.__entities.remove(element)
+
+    def track(self, owner, resource):
+        """
+        Register a canvas item id, RawTurtle or Sprite as owned by the given
+        element (or by the game itself), and return the resource
+        """
+        self.__resources.setdefault(owner, set()).add(resource)
+        return resource
+
+    def free(self, owner) -> None:
+        """
+        Delete every resource registered by the owner, whatever its own
+        delete() method did
+        """
+        for resource in self.__resources.pop(owner, ()):
+            if isinstance(resource, int):
+                self.__canvas.delete(resource)
+            elif isinstance(resource, Sprite):
+                resource.delete()
+            else:
+                resource.clear()
+                resource.hideturtle()
+                if resource in resource.screen.turtles():
+                    resource.screen.turtles().remove(resource)
+                self.__canvas.delete(*self.__turtle_items(resource))
+
+    @staticmethod
+    def __turtle_items(resource) -> list[int]:
+        if isinstance(resource, int):
+            return [resource]
+        if isinstance(resource, Sprite):
+            return resource.items()
+        # pylint: disable-next=protected-access
+        return [resource.turtle._item, resource.drawingLineItem,
+                resource.currentLineItem, *resource.items]
+
+    def leak_report(self) -> dict:
+        """
+        Report canvas items and turtles that exist although no live owner
+        has registered them, e.g., ones left behind by a removed element
+        """
+        owned_items = set(self.__screen_items)
+        owned_turtles = set()
+        for resources in self.__resources.values():
+            for resource in resources:
+                owned_items.update(self.__turtle_items(resource))
+                if not isinstance(resource, (int, Sprite)):
+                    owned_turtles.add(resource)
+        items = [item for item in self.__canvas.find_all() if item not in owned_items]
+        turtles = ([t for t in self.__screen.turtles() if t not in owned_turtles]
+                   if self.__screen is not None else [])
+        return {
+            "owners": len(self.__resources),
+            "canvas_items": len(self.__canvas.find_all()),
+            "leaked_items": [(item, self.__canvas.type(item)) for item in items],
+            "leaked_turtles": len(turtles),
+        }
 
     @property
     def canvas(self) -> tk.Canvas:
         """
-        Get the canvas object of the game application
+        Get the canvas object of the game application, which is an in-memory
+        canvas when the game is headless or threaded
         """
         return self.__canvas
 
+    @property
+    def display(self) -> tk.Canvas | None:
+        """
+        Get the canvas shown in the window, or None for a headless game
+        """
+        return self.__display
+
+    @property
+    def screen(self) -> turtle.TurtleScreen:
+        """
+        Get the turtle screen drawing on the game's canvas, for creating
+        RawTurtle objects
+        """
+        if self.__screen is None:
+            if self.__in_memory:
+                self.__screen = HeadlessScreen(self.__canvas)
+            else:
+                self.__screen = turtle.TurtleScreen(self.__canvas)
+            # e.g., the background image item belongs to the screen itself
+            self.__screen_items = set(self.__canvas.find_all())
+        return self.__screen
+
+    @property
+    def is_headless(self) -> bool:
+        """
+        Get the flag indicating whether the game runs without a display
+        """
+        return self.__headless
+
+    @property
+    def is_threaded(self) -> bool:
+        """
+        Get the flag indicating whether the game runs on a worker thread
+        """
+        return self.__threaded
+
+    @property
+    def input_latency(self) -> float:
+        """
+        Get the time in milliseconds the last input event of a threaded game
+        waited before the worker handled it
+        """
+        return self.__input_latency
+
+    @property
+    def update_delay(self) -> int:
+        """
+        Get the duration of one simulation tick in milliseconds
+        """
+        return self.__update_delay
+
+    @property
+    def frame_delay(self) -> int:
+        """
+        Get the time between rendered frames in milliseconds
+        """
+        return self.__frame_delay
+
+    @property
+    def is_interpolating(self) -> bool:
+        """
+        Get the flag indicating whether frames between ticks are drawn with
+        interpolated positions
+        """
+        return self.__interpolate
+
+    @property
+    def alpha(self) -> float:
+        """
+        Get the fraction of a tick the frame being rendered is past the last
+        tick, from 0 to 1, by which elements are interpolated
+        """
+        return self.__alpha
+
+    @property
+    def ticks(self) -> int:
+        """
+        Get or set the number of simulation ticks run so far, e.g., when a
+        saved game is restored
+        """
+        return self.__ticks
+
+    @ticks.setter
+    def ticks(self, val: int) -> None:
+        self.__ticks = val
+
+    @property
+    def time(self) -> float:
+        """
+        Get the simulation time in seconds, which advances by a fixed step
+        every tick regardless of the machine load
+        """
+        return self.__ticks * self.__update_delay / 1000
+
+    @property
+    def frames_skipped(self) -> int:
+        """
+        Get the number of frames whose rendering was skipped because the
+        frame budget had run out
+        """
+        return self.__frames_skipped
+
+    def wall_clock(self) -> float:
+        """
+        Get the current wall-clock time in milliseconds, which is simulated
+        when the game runs headless
+        """
+        if self.__in_memory:
+            return self.__clock.now
+        return time.monotonic() * 1000
+
+    def after(self, ms, func=None, *args):
+        """
+        Schedule func to be called after the given milliseconds, using
+        simulated time when the game runs headless
+        """
+        if self.__in_memory:
+            return self.__clock.after(ms, func, *args)
+        return super().after(ms, func, *args)
+
+    def after_cancel(self, id):
+        """
+        Cancel a callback scheduled with after()
+        """
+        if self.__in_memory:
+            self.__clock.after_cancel(id)
+        else:
+            super().after_cancel(id)
+
+    @property
+    def scheduler(self) -> TickScheduler:
+        """
+        Get the scheduler whose timers are run at the start of every tick
+        """
+        return self.__scheduler
+
+    def after_ticks(self, ticks: int, func, *args, every: int | None = None,
+                    times: int | None = None, group=None) -> int:
+        """
+        Schedule func to be called at the start of the tick the given number
+        of simulation ticks from now, so that it happens at the same point of
+        the simulation however fast the game runs.  See
+        TickScheduler.schedule() for repeating timers and groups.
+        """
+        return self.__scheduler.schedule(ticks, func, *args, every=every,
+                                         times=times, group=group)
+
+    def clear_tick_timers(self) -> None:
+        """
+        Cancel every callback scheduled with after_ticks()
+        """
+        self.__scheduler.clear()
+
+    def step(self, ticks: int = 1) -> None:
+        """
+        Run the headless game for the given number of update ticks without
+        waiting for the wall clock
+        """
+        if not self.__headless:
+            raise RuntimeError("step() is only available for headless games")
+        self.__clock.advance(ticks * self.__update_delay)
+
+    def enable_profiler(self, overlay: bool = True, path: str | None = None) -> FrameProfiler:
+        """
+        Start timing update() and render() of every element and the whole
+        frame.  The summary is shown on the canvas if overlay is True, and
+        the report is written as JSON to path whenever the game stops.
+        """
+        self.__profiler = FrameProfiler()
+        self.__profile_overlay = overlay
+        self.__profile_path = path
+        return self.__profiler
+
+    @property
+    def profiler(self) -> FrameProfiler | None:
+        """
+        Get the frame profiler, or None if profiling is not enabled
+        """
+        return self.__profiler
+
+    def __record_counts(self) -> None:
+        turtles = len(self.__screen.turtles()) if self.__screen is not None else 0
+        self.__profiler.record_counts(len(self.__canvas.find_all()), turtles)
+
     @property
     def is_started(self) -> bool:
         """
@@ -145,29 +1075,209 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
         """
         Start the game
         """
+        if self.__threaded:
+            self.__started = True
+            if self.__worker is None:
+                self.__start_worker()
+            return
         if not self.__started:
             self.__started = True
-            self.animate()
+            self.__accumulator = 0
+            self.__last_frame = self.wall_clock()
+            self.__after_id = self.after(0, self.animate)
 
     def stop(self) -> None:
         """
         Stop the game
         """
         self.__started = False
+        self.__run += 1
+        if self.__after_id is not None:
+            self.after_cancel(self.__after_id)
+            self.__after_id = None
+        if self.__profiler is not None and self.__profile_path is not None:
+            self.__record_counts()
+            self.__profiler.dump(self.__profile_path)
+
+    def __start_worker(self) -> None:
+        # events bound to the in-memory canvas are queued from the window
+        for sequence in self.__canvas.bindings():
+            self.__display.bind(sequence, lambda event, sequence=sequence:
+                                self.__inputs.put((time.monotonic() * 1000,
+                                                   sequence, event.x, event.y)))
+        self.__worker = threading.Thread(target=self.__simulate, daemon=True)
+        self.__worker.start()
+        self.__present(CanvasMirror(self.__display), None)
+
+    def __simulate(self) -> None:
+        """
+        Run the threaded game on the worker: handle queued input, run one
+        tick, render on the in-memory canvas and publish its snapshot, at
+        the pace of the update delay
+        """
+        step = self.__update_delay / 1000
+        next_tick = time.monotonic()
+        while not self.__closing:
+            while not self.__inputs.empty():
+                stamp, sequence, x, y = self.__inputs.get()
+                self.__input_latency = time.monotonic() * 1000 - stamp
+                self.__canvas.event_generate(sequence, x=x, y=y)
+            if self.__started:
+                self.__clock.advance(self.__update_delay)
+                self.tick()
+                self.render()
+            # publishing replaces a single reference, so the Tk thread
+            # always sees a whole snapshot without any lock
+            self.__snapshot = self.__canvas.snapshot()
+            next_tick += step
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+
+    def __present(self, mirror: CanvasMirror, shown: tuple | None) -> None:
+        """
+        Copy the latest snapshot of a threaded game to the window
+        """
+        snapshot = self.__snapshot
+        if snapshot is not None and snapshot is not shown:
+            mirror.apply(snapshot)
+        if not self.__closing:
+            tk.Frame.after(self, self.__update_delay, self.__present, mirror, snapshot)
+
+    def destroy(self) -> None:
+        self.__closing = True
+        self.__release_screen()
+        super().destroy()
+
+    def close(self) -> None:
+        """
+        Stop the game and release its turtle screen, e.g., when a headless
+        game, which has no window to destroy, is done with
+        """
+        self.stop()
+        self.clear_tick_timers()
+        self.__release_screen()
+
+    def __release_screen(self) -> None:
+        # every RawTurtle registers its screen in a list global to the turtle
+        # module, which would keep the canvas and elements of a finished
+        # in-memory game alive for the life of the process
+        if self.__in_memory and self.__screen in turtle.RawTurtle.screens:
+            turtle.RawTurtle.screens.remove(self.__screen)
+
+    def tick(self) -> None:
+        """
+        Advance the simulation of all game's elements by one fixed step
+        """
+        self.__ticks += 1
+        self.__scheduler.advance()
+        entities = self.__entities
+        if self.__interpolate or self.save_previous_states:
+            for element in entities:
+                element.save_state()
+        # elements may remove themselves or others while being updated
+        entities.defer_removals()
+        profiler = self.__profiler
+        if profiler is None:
+            for element in entities:
+                element.update()
+        else:
+            for element in entities:
+                start = time.perf_counter()
+                element.update()
+                profiler.record_update(type(element).__name__,
+                                       (time.perf_counter() - start) * 1000)
+        doomed, self.__doomed = self.__doomed, []
+        for element in doomed:
+            element.delete()
+            self.free(element)
+        entities.flush()
+
+    def request_redraw(self, element: GameElement) -> None:
+        """
+        Record that the element needs the turtle screen to be refreshed
+        """
+        self.__redraw_requests.add(element)
+
+    def render(self) -> None:
+        """
+        Render all game's elements that have changed since the last frame,
+        or are still moving between two ticks when the game interpolates,
+        then refresh the turtle screen once for all elements that asked for it
+        """
+        profiler = self.__profiler
+        interpolate = self.__interpolate
+        if profiler is None:
+            for element in self.__entities:
+                if element.is_dirty or (interpolate and element.is_moving):
+                    element.render()
+                    element.mark_clean()
+        else:
+            for element in self.__entities:
+                if not (element.is_dirty or (interpolate and element.is_moving)):
+                    continue
+                start = time.perf_counter()
+                element.render()
+                element.mark_clean()
+                profiler.record_render(type(element).__name__,
+                                       (time.perf_counter() - start) * 1000)
+        if self.__redraw_requests:
+            self.__redraw_requests.clear()
+            self.screen.update()
+        if (profiler is not None and self.__profile_overlay
+                and profiler.frames % 15 == 0):
+            self.__record_counts()
+            self.track(self, profiler.draw_overlay(self.__canvas))
 
     def animate(self):
         """
-        Update and render all game's elements
+        Run as many fixed simulation steps as the elapsed wall-clock time
+        calls for, render once, and schedule the next frame, which is the
+        next tick unless the game interpolates
         """
-        for element in self.__game_elements:
-            element.update()
-            element.render()
-        if self.__started:
-            self.after(self.__update_delay, self.animate)
+        self.__after_id = None
+        run = self.__run
+        now = self.wall_clock()
+        frame_start = time.perf_counter()
+        step = self.__update_delay
+        # after a long stall, drop the backlog instead of trying to catch up
+        # with a burst of ticks that would stall the next frame as well
+        self.__accumulator += min(now - self.__last_frame,
+                                  step * self.__max_catch_up)
+        self.__last_frame = now
+        while self.__accumulator >= step and run == self.__run:
+            self.tick()
+            self.__accumulator -= step
+        if run != self.__run:
+            # the game was stopped, or stopped and restarted, during a tick
+            return
+        if self.__interpolate:
+            self.__alpha = self.__accumulator / step
+        # skip rendering when the ticks used up the frame budget, but never
+        # for more than a few frames in a row
+        if (self.wall_clock() - now < self.__frame_delay
+                or self.__skip_streak >= self.__max_catch_up):
+            self.render()
+            self.__skip_streak = 0
+        else:
+            self.__skip_streak += 1
+            self.__frames_skipped += 1
+        if self.__profiler is not None:
+            self.__profiler.record_frame(now, (time.perf_counter() - frame_start) * 1000)
+        if self.__interpolate:
+            delay = self.__frame_delay - (self.wall_clock() - now)
+        else:
+            delay = step - self.__accumulator - (self.wall_clock() - now)
+        self.__after_id = self.after(max(1, round(delay)), self.animate)
 
     def reset_game(self):
         self.stop()
-        for ele in self.__game_elements:
+        self.clear_tick_timers()
+        for ele in self.__entities:
             ele.delete()
-            del ele
-        self.__game_elements = []
+            self.free(ele)
+        self.__entities.clear()
+        # registered again by the first RawTurtle created on it
+        self.__release_screen()
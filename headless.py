@@ -0,0 +1,375 @@
+"""
+The headless module provides in-memory replacements for the parts of tkinter
+used by the game, so that the same game logic can be simulated without a
+display, e.g., for regression runs and difficulty tuning.
+"""
+import heapq
+from types import SimpleNamespace
+from turtle import TurtleScreen
+
+
+class HeadlessCanvas:
+    """
+    An in-memory stand-in for tkinter's Canvas.  Items are kept in a
+    dictionary in display-list order and are never drawn, but snapshot()
+    can copy them to a real canvas through a CanvasMirror.
+    """
+
+    def __init__(self, width: int = 0, height: int = 0):
+        self.__options: dict = {"width": width, "height": height, "bg": "white"}
+        self.__items: dict[int, list] = {}
+        self.__bindings: dict[str, object] = {}
+        self.__next_id: int = 1
+
+    def __getitem__(self, key):
+        return self.cget(key)
+
+    def cget(self, key):
+        """
+        Get the value of a canvas option
+        """
+        return self.__options.get(key, "")
+
+    def config(self, **options) -> None:
+        """
+        Set canvas options
+        """
+        self.__options.update(options)
+
+    configure = config
+
+    def winfo_width(self) -> int:
+        """
+        Get the width of the canvas
+        """
+        return int(self.__options["width"])
+
+    def winfo_height(self) -> int:
+        """
+        Get the height of the canvas
+        """
+        return int(self.__options["height"])
+
+    def winfo_rgb(self, color):
+        """
+        Accept any color, as nothing is ever drawn
+        """
+        return (0, 0, 0)
+
+    def __create(self, kind: str, args, options) -> int:
+        item = self.__next_id
+        self.__next_id += 1
+        # kind, coords, options and the frozen copy of the item, if any
+        self.__items[item] = [kind, self.__flatten(args), dict(options), None]
+        return item
+
+    @staticmethod
+    def __flatten(args) -> list:
+        coords = []
+        for arg in args:
+            if isinstance(arg, (tuple, list)):
+                coords.extend(arg)
+            else:
+                coords.append(arg)
+        return coords
+
+    def create_line(self, *args, **options) -> int:
+        """
+        Create a line item
+        """
+        return self.__create("line", args, options)
+
+    def create_rectangle(self, *args, **options) -> int:
+        """
+        Create a rectangle item
+        """
+        return self.__create("rectangle", args, options)
+
+    def create_oval(self, *args, **options) -> int:
+        """
+        Create an oval item
+        """
+        return self.__create("oval", args, options)
+
+    def create_polygon(self, *args, **options) -> int:
+        """
+        Create a polygon item
+        """
+        return self.__create("polygon", args, options)
+
+    def create_text(self, *args, **options) -> int:
+        """
+        Create a text item
+        """
+        return self.__create("text", args, options)
+
+    def create_image(self, *args, **options) -> int:
+        """
+        Create an image item
+        """
+        return self.__create("image", args, options)
+
+    def coords(self, item: int, *args):
+        """
+        Get or set the coordinates of an item
+        """
+        if item not in self.__items:
+            return []
+        if args:
+            self.__items[item][1] = self.__flatten(args)
+            self.__items[item][3] = None
+            return None
+        return list(self.__items[item][1])
+
+    def itemconfigure(self, item: int, **options) -> None:
+        """
+        Set options of an item
+        """
+        if item in self.__items:
+            self.__items[item][2].update(options)
+            self.__items[item][3] = None
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, item: int, option: str):
+        """
+        Get an option of an item
+        """
+        return self.__items[item][2].get(option, "")
+
+    def type(self, item: int):
+        """
+        Get the type of an item
+        """
+        if item not in self.__items:
+            return None
+        return self.__items[item][0]
+
+    def bbox(self, item: int):
+        """
+        Get the bounding box of an item
+        """
+        coords = self.__items[item][1]
+        xs, ys = coords[0::2], coords[1::2]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    def find_all(self) -> tuple:
+        """
+        Get all items in display-list order
+        """
+        return tuple(self.__items)
+
+    def delete(self, *items) -> None:
+        """
+        Delete the given items, or every item if "all" is given
+        """
+        for item in items:
+            if item == "all":
+                self.__items.clear()
+            else:
+                self.__items.pop(item, None)
+
+    def tag_raise(self, item: int) -> None:
+        """
+        Move an item to the top of the display list
+        """
+        if item in self.__items:
+            self.__items[item] = self.__items.pop(item)
+
+    def tag_lower(self, item: int) -> None:
+        """
+        Move an item to the bottom of the display list
+        """
+        if item in self.__items:
+            data = self.__items.pop(item)
+            self.__items = {item: data, **self.__items}
+
+    def bind(self, sequence: str, func=None, add=None) -> None:
+        """
+        Bind an event handler to the canvas
+        """
+        self.__bindings[sequence] = func
+
+    def unbind(self, sequence: str, funcid=None) -> None:
+        """
+        Remove an event handler from the canvas
+        """
+        self.__bindings.pop(sequence, None)
+
+    def tag_bind(self, item, sequence: str, func=None, add=None) -> None:
+        """
+        Item bindings are ignored, as items are never clicked
+        """
+
+    def tag_unbind(self, item, sequence: str, funcid=None) -> None:
+        """
+        Item bindings are ignored, as items are never clicked
+        """
+
+    def bindings(self) -> list[str]:
+        """
+        Get the event sequences bound to the canvas
+        """
+        return list(self.__bindings)
+
+    def snapshot(self) -> tuple:
+        """
+        Return an immutable copy of the canvas as (options, items), with
+        items as (id, kind, coords, options) tuples in display-list order.
+        Items unchanged since the last snapshot are the very same tuples.
+        """
+        items = []
+        for item, data in self.__items.items():
+            frozen = data[3]
+            if frozen is None:
+                frozen = data[3] = (item, data[0], tuple(data[1]),
+                                    tuple(data[2].items()))
+            items.append(frozen)
+        return tuple(self.__options.items()), tuple(items)
+
+    def event_generate(self, sequence: str, x: float = 0, y: float = 0) -> None:
+        """
+        Invoke the handler bound to the given event sequence
+        """
+        handler = self.__bindings.get(sequence)
+        if handler is not None:
+            handler(SimpleNamespace(x=x, y=y, widget=self))
+
+    def canvasx(self, x: float) -> float:
+        """
+        Convert a window x coordinate to a canvas x coordinate
+        """
+        return x
+
+    def canvasy(self, y: float) -> float:
+        """
+        Convert a window y coordinate to a canvas y coordinate
+        """
+        return y
+
+    def update(self) -> None:
+        """
+        Nothing to redraw without a display
+        """
+
+    def after(self, ms, func=None, *args) -> None:
+        """
+        Turtle uses this only to delay its animation, which is skipped
+        """
+
+    def focus_force(self) -> None:
+        """
+        There is no window to focus
+        """
+
+
+class CanvasMirror:
+    """
+    Keep a real canvas identical to the snapshots of a HeadlessCanvas,
+    sending only the changes since the previous snapshot
+    """
+
+    def __init__(self, canvas):
+        self.__canvas = canvas
+        self.__options: tuple = ()
+        self.__shown: dict[int, tuple[int, tuple]] = {}
+        self.__order: tuple = ()
+
+    def apply(self, snapshot: tuple) -> None:
+        """
+        Make the canvas show the given snapshot
+        """
+        canvas = self.__canvas
+        options, items = snapshot
+        if options != self.__options:
+            canvas.config(**dict(options))
+            self.__options = options
+        shown = self.__shown
+        current = {}
+        for entry in items:
+            item, kind, coords, item_options = entry
+            known = shown.get(item)
+            if known is None:
+                create = getattr(canvas, f"create_{kind}")
+                current[item] = (create(*coords, **dict(item_options)), entry)
+                continue
+            canvas_id, previous = known
+            if previous is not entry:
+                if previous[2] != coords:
+                    canvas.coords(canvas_id, *coords)
+                if previous[3] != item_options:
+                    canvas.itemconfigure(canvas_id, **dict(item_options))
+            current[item] = (canvas_id, entry)
+        for item, (canvas_id, _) in shown.items():
+            if item not in current:
+                canvas.delete(canvas_id)
+        self.__shown = current
+        order = tuple(current)
+        if order != self.__order:
+            for canvas_id, _ in current.values():
+                canvas.tag_raise(canvas_id)
+            self.__order = order
+
+
+class HeadlessScreen(TurtleScreen):
+    """
+    A TurtleScreen drawing on a HeadlessCanvas, so that ordinary RawTurtle
+    objects can be used without a display.
+    """
+
+    def _blankimage(self):
+        return ""
+
+    def _image(self, filename):
+        return filename
+
+
+class VirtualClock:
+    """
+    A replacement of Tk's after() timers driven by simulated time, so that
+    scheduled callbacks run as fast as the CPU allows.
+    """
+
+    def __init__(self):
+        self.__now: float = 0
+        self.__queue: list = []
+        self.__count: int = 0
+        self.__cancelled: set[str] = set()
+
+    @property
+    def now(self) -> float:
+        """
+        Get the simulated time in milliseconds
+        """
+        return self.__now
+
+    def after(self, ms: float, func, *args) -> str:
+        """
+        Schedule func to be called after ms milliseconds of simulated time
+        """
+        self.__count += 1
+        timer_id = f"after#{self.__count}"
+        heapq.heappush(self.__queue,
+                       (self.__now + ms, self.__count, timer_id, func, args))
+        return timer_id
+
+    def after_cancel(self, timer_id: str) -> None:
+        """
+        Cancel a callback scheduled with after()
+        """
+        self.__cancelled.add(timer_id)
+
+    def advance(self, ms: float) -> None:
+        """
+        Move the simulated time forward, calling every callback that becomes
+        due in order
+        """
+        target = self.__now + ms
+        while self.__queue and self.__queue[0][0] <= target:
+            due, _, timer_id, func, args = heapq.heappop(self.__queue)
+            if timer_id in self.__cancelled:
+                self.__cancelled.discard(timer_id)
+                continue
+            self.__now = due
+            func(*args)
+        self.__now = target
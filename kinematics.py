@@ -0,0 +1,53 @@
+"""
+The kinematics module keeps the position and heading of moving game elements
+as plain floats, so that moving them every tick allocates nothing, unlike
+turtle's methods that build Vec2D objects and go through the screen's
+coordinate scaling.  The turtle is then only moved once per frame to where
+the body is.
+"""
+import math
+
+
+class Body:
+    """
+    A position (x, y) and a heading in degrees, counterclockwise from east
+    in the turtle's world coordinates, changed in place
+    """
+    __slots__ = ("x", "y", "heading")
+
+    def __init__(self, x: float = 0, y: float = 0, heading: float = 0):
+        self.x: float = x
+        self.y: float = y
+        self.heading: float = heading
+
+    def heading_to(self, x: float, y: float) -> float:
+        """
+        Return the heading from the body to the point (x, y)
+        """
+        return math.degrees(math.atan2(y - self.y, x - self.x)) % 360
+
+    def face(self, x: float, y: float) -> None:
+        """
+        Turn the body toward the point (x, y)
+        """
+        self.heading = self.heading_to(x, y)
+
+    def turn(self, angle: float) -> None:
+        """
+        Turn the body counterclockwise by angle degrees
+        """
+        self.heading = (self.heading + angle) % 360
+
+    def forward(self, distance: float) -> None:
+        """
+        Move the body by the given distance along its heading
+        """
+        rad = math.radians(self.heading)
+        self.x += distance * math.cos(rad)
+        self.y += distance * math.sin(rad)
+
+    def distance_to(self, x: float, y: float) -> float:
+        """
+        Return the distance from the body to the point (x, y)
+        """
+        return math.hypot(x - self.x, y - self.y)
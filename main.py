@@ -1,7 +1,9 @@
 """
 The main module, responsible for creating a root window containing the game's
-main component.
+main component.  Pass --threaded to run the game's simulation on a worker
+thread.
 """
+import sys
 from typing import Final
 import tkinter as tk
 from turtle_adventure import TurtleAdventureGame
@@ -14,6 +16,7 @@ if __name__ == "__main__":
     root.title("Turtle's Adventure")
     root.geometry(f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}")
     root.resizable(False, False) # games usually have fixed window size
-    game = TurtleAdventureGame(root, SCREEN_WIDTH, SCREEN_HEIGHT, level=1)
+    game = TurtleAdventureGame(root, SCREEN_WIDTH, SCREEN_HEIGHT, level=1,
+                               threaded="--threaded" in sys.argv)
     game.start()
     root.mainloop()
@@ -0,0 +1,148 @@
+"""
+The profiler module provides instrumentation of the game loop, showing where
+the frame time goes per kind of game element.
+"""
+import json
+from collections import deque
+
+
+class FrameProfiler:
+    """
+    Collect the time spent in update() and render() per GameElement class,
+    the frame-time distribution, the frame rate, and the numbers of canvas
+    items and live turtles.  Times are given in milliseconds.
+    """
+
+    def __init__(self, window: int = 300):
+        self.__update: dict[str, list] = {}
+        self.__render: dict[str, list] = {}
+        self.__frame_times: deque[float] = deque(maxlen=window)
+        self.__frame_starts: deque[float] = deque(maxlen=window)
+        self.__frames: int = 0
+        self.__canvas_items: int = 0
+        self.__turtles: int = 0
+        self.__overlay: int | None = None
+
+    @staticmethod
+    def __add(table: dict[str, list], name: str, ms: float) -> None:
+        entry = table.get(name)
+        if entry is None:
+            table[name] = [ms, 1, ms]
+        else:
+            entry[0] += ms
+            entry[1] += 1
+            if ms > entry[2]:
+                entry[2] = ms
+
+    def record_update(self, name: str, ms: float) -> None:
+        """
+        Add the duration of one update() call of an element of the given class
+        """
+        self.__add(self.__update, name, ms)
+
+    def record_render(self, name: str, ms: float) -> None:
+        """
+        Add the duration of one render() call of an element of the given class
+        """
+        self.__add(self.__render, name, ms)
+
+    def record_frame(self, start: float, ms: float) -> None:
+        """
+        Add one frame that started at the given wall-clock time and took the
+        given time to run
+        """
+        self.__frames += 1
+        self.__frame_starts.append(start)
+        self.__frame_times.append(ms)
+
+    def record_counts(self, canvas_items: int, turtles: int) -> None:
+        """
+        Record the current numbers of canvas items and live turtles
+        """
+        self.__canvas_items = canvas_items
+        self.__turtles = turtles
+
+    @property
+    def frames(self) -> int:
+        """
+        Get the number of frames recorded so far
+        """
+        return self.__frames
+
+    @property
+    def fps(self) -> float:
+        """
+        Get the frame rate over the recent frames
+        """
+        starts = self.__frame_starts
+        if len(starts) < 2 or starts[-1] == starts[0]:
+            return 0
+        return (len(starts)-1) * 1000 / (starts[-1] - starts[0])
+
+    def percentile(self, pct: float) -> float:
+        """
+        Get the given percentile of the recent frame times
+        """
+        if not self.__frame_times:
+            return 0
+        times = sorted(self.__frame_times)
+        return times[min(len(times)-1, int(len(times) * pct / 100))]
+
+    @staticmethod
+    def __summary(table: dict[str, list]) -> dict[str, dict]:
+        return {name: {"total_ms": total, "calls": calls,
+                       "mean_ms": total/calls, "max_ms": worst}
+                for name, (total, calls, worst) in table.items()}
+
+    def report(self) -> dict:
+        """
+        Return all measurements as a dictionary
+        """
+        return {
+            "frames": self.__frames,
+            "fps": self.fps,
+            "frame_ms": {
+                "p50": self.percentile(50),
+                "p95": self.percentile(95),
+                "p99": self.percentile(99),
+                "max": max(self.__frame_times, default=0),
+            },
+            "canvas_items": self.__canvas_items,
+            "turtles": self.__turtles,
+            "update": self.__summary(self.__update),
+            "render": self.__summary(self.__render),
+        }
+
+    def dump(self, path: str) -> None:
+        """
+        Write the report to a JSON file
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=2)
+
+    def overlay_text(self) -> str:
+        """
+        Return a short multi-line summary for showing on the screen
+        """
+        lines = [f"FPS {self.fps:5.1f}  frame p50 {self.percentile(50):.2f}"
+                 f" p95 {self.percentile(95):.2f} p99 {self.percentile(99):.2f} ms",
+                 f"items {self.__canvas_items}  turtles {self.__turtles}"]
+        for name in sorted(self.__update.keys() | self.__render.keys()):
+            update = self.__update.get(name, [0, 1, 0])
+            render = self.__render.get(name, [0, 1, 0])
+            lines.append(f"{name:<16} update {update[0]/update[1]:.3f}"
+                         f"  render {render[0]/render[1]:.3f} ms")
+        return "\n".join(lines)
+
+    def draw_overlay(self, canvas) -> int:
+        """
+        Show the summary in the top-left corner of the canvas, recreating the
+        text item if the canvas has been cleared, and return the item id
+        """
+        if self.__overlay is None or canvas.type(self.__overlay) is None:
+            self.__overlay = canvas.create_text(5, 5, anchor="nw",
+                                                font=("Courier", 9),
+                                                fill="gray25")
+        canvas.itemconfigure(self.__overlay, text=self.overlay_text())
+        canvas.tag_raise(self.__overlay)
+        return self.__overlay
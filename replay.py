@@ -0,0 +1,116 @@
+"""
+The replay module records the inputs of a game session to a compact file and
+replays the session deterministically, as fast as possible.
+
+A recording starts with a header holding the format version, the random seed,
+the level, the screen size, the update delay and whether the batch engine
+was used, all of which change how the game plays, followed by one fixed-size
+record per waypoint click with the tick at which it happened.
+
+Usage: python replay.py FILE
+"""
+import struct
+import sys
+import time
+from turtle_adventure import TurtleAdventureGame
+
+MAGIC = b"TADR"
+VERSION = 2
+# magic, version, seed, level, width, height, update delay, batch
+HEADER = struct.Struct("<4sHIHHHH?")
+CLICK = struct.Struct("<Iff")         # tick, x, y
+
+
+class Recorder:
+    """
+    Log the seed of a game and every waypoint click by tick number.  Each
+    click is written right away, so a recording survives a crashed session.
+    """
+
+    def __init__(self, game: TurtleAdventureGame, path: str):
+        self.__file = open(path, "wb")  # pylint: disable=consider-using-with
+        self.__file.write(HEADER.pack(MAGIC, VERSION, game.seed, game.level,
+                                      game.screen_width, game.screen_height,
+                                      game.update_delay,
+                                      game.batch is not None))
+        self.__file.flush()
+        game.recorder = self
+
+    def record(self, tick: int, x: float, y: float) -> None:
+        """
+        Log a click at (x, y) made after the given tick
+        """
+        self.__file.write(CLICK.pack(tick, x, y))
+        self.__file.flush()
+
+    def close(self) -> None:
+        """
+        Close the recording file
+        """
+        self.__file.close()
+
+
+class Recording:
+    """
+    A recorded session that can be replayed headless
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, seed: int, level: int, width: int, height: int,
+                 clicks: list[tuple[int, float, float]], update_delay: int = 33,
+                 batch: bool = False):
+        self.seed: int = seed
+        self.level: int = level
+        self.width: int = width
+        self.height: int = height
+        self.update_delay: int = update_delay
+        self.batch: bool = batch
+        self.clicks: list[tuple[int, float, float]] = clicks
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        """
+        Read a recording file
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        (magic, version, seed, level, width, height, update_delay,
+         batch) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} recording")
+        body = data[HEADER.size:]
+        body = body[:len(body) - len(body) % CLICK.size]
+        clicks = list(CLICK.iter_unpack(body))
+        return cls(seed, level, width, height, clicks, update_delay, batch)
+
+    def replay(self, max_ticks: int | None = None) -> TurtleAdventureGame:
+        """
+        Re-run the session headless without rendering or waiting for any
+        timer, until the game ends or max_ticks ticks have run, and return
+        the game
+        """
+        game = TurtleAdventureGame(None, self.width, self.height,
+                                   level=self.level, headless=True,
+                                   seed=self.seed, batch=self.batch,
+                                   update_delay=self.update_delay)
+        game.start()
+        clicks = self.clicks
+        i = 0
+        while game.is_started and (max_ticks is None or game.ticks < max_ticks):
+            while i < len(clicks) and clicks[i][0] <= game.ticks:
+                game.click(clicks[i][1], clicks[i][2])
+                i += 1
+            game.tick()
+        return game
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(__doc__.split("Usage: ")[1])
+    recording = Recording.load(sys.argv[1])
+    start = time.perf_counter()
+    replayed = recording.replay()
+    elapsed = time.perf_counter() - start
+    print(f"seed {recording.seed}, {len(recording.clicks)} clicks: "
+          f"{replayed.outcome or 'unfinished'} at level {replayed.level} "
+          f"after {replayed.ticks} ticks, replayed in {elapsed:.3f} s")
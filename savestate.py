@@ -0,0 +1,88 @@
+"""
+The savestate module encodes the whole state of a game into a compact binary
+blob and decodes it back, for restarting from a checkpoint or forking a game
+into several ones.
+
+A blob starts with a header holding the format version, the level, the tick,
+the random seed, the outcome and whether spawning is paused, followed by the state of the random
+generator, the spawns still to come as (ticks remaining, enemy type index)
+pairs, and one record per element: its kind, the index of the record of the
+element it belongs to, e.g., the gun of a bullet, or -1, and its state as
+doubles.
+"""
+import struct
+
+MAGIC = b"TADS"
+VERSION = 1
+OUTCOMES = (None, "win", "lose")
+# magic, version, level, tick, seed, outcome, spawning paused
+HEADER = struct.Struct("<4sHHIIB?")
+RANDOM = struct.Struct("<625I?d")     # Mersenne Twister words, has gauss, gauss
+COUNT = struct.Struct("<I")
+SPAWN = struct.Struct("<IH")          # ticks remaining, enemy type index
+RECORD = struct.Struct("<BiB")        # kind, owner record, number of values
+
+
+class SaveState:
+    """
+    A snapshot of a game as plain values, convertible to and from bytes
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, level: int, ticks: int, seed: int, outcome: str | None,
+                 random_state: tuple, spawns: list[tuple[int, int]],
+                 records: list[tuple[int, int, tuple[float, ...]]],
+                 paused: bool = False):
+        self.level: int = level
+        self.ticks: int = ticks
+        self.seed: int = seed
+        self.outcome: str | None = outcome
+        self.random_state: tuple = random_state
+        self.spawns: list[tuple[int, int]] = spawns
+        self.records: list[tuple[int, int, tuple[float, ...]]] = records
+        self.paused: bool = paused
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the snapshot
+        """
+        _, words, gauss = self.random_state
+        parts = [HEADER.pack(MAGIC, VERSION, self.level, self.ticks, self.seed,
+                             OUTCOMES.index(self.outcome), self.paused),
+                 RANDOM.pack(*words, gauss is not None, gauss or 0),
+                 COUNT.pack(len(self.spawns))]
+        parts.extend(SPAWN.pack(ticks, kind) for ticks, kind in self.spawns)
+        parts.append(COUNT.pack(len(self.records)))
+        for kind, owner, values in self.records:
+            parts.append(RECORD.pack(kind, owner, len(values)))
+            parts.append(struct.pack(f"<{len(values)}d", *values))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SaveState":
+        """
+        Decode a snapshot encoded by to_bytes()
+        """
+        (magic, version, level, ticks, seed, outcome,
+         paused) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} game snapshot")
+        offset = HEADER.size
+        *words, has_gauss, gauss = RANDOM.unpack_from(data, offset)
+        offset += RANDOM.size
+        (count,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        spawns = [SPAWN.unpack_from(data, offset + i*SPAWN.size) for i in range(count)]
+        offset += count * SPAWN.size
+        (count,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        records = []
+        for _ in range(count):
+            kind, owner, size = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            values = struct.unpack_from(f"<{size}d", data, offset)
+            offset += 8 * size
+            records.append((kind, owner, values))
+        random_state = (3, tuple(words), gauss if has_gauss else None)
+        return cls(level, ticks, seed, OUTCOMES[outcome], random_state,
+                   spawns, records, paused)
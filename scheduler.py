@@ -0,0 +1,168 @@
+"""
+The scheduler module provides a timer queue driven by the simulation ticks
+of the game loop, so that scheduled events stay in lockstep with the game
+however fast it runs, headless or not.
+"""
+import heapq
+
+
+class TickScheduler:
+    """
+    Call functions after a number of ticks, optionally repeating them, with
+    O(log n) scheduling and cancellation.  Timers may belong to a group, e.g.,
+    the enemy generator of a level, so that all of them can be cancelled,
+    paused or resumed at once.  Timers due at the same tick run in the order
+    they were scheduled.
+    """
+
+    def __init__(self):
+        self.__now: int = 0
+        self.__queue: list = []
+        self.__count: int = 0
+        self.__pushes: int = 0
+        # timer id -> [due tick, func, args, every, times left, group,
+        #              number of its live queue entry]
+        self.__timers: dict[int, list] = {}
+        self.__paused: bool = False
+        # paused group -> {timer id: ticks remaining}
+        self.__paused_groups: dict[object, dict[int, int]] = {}
+
+    @property
+    def now(self) -> int:
+        """
+        Get the number of ticks the scheduler has run while not paused
+        """
+        return self.__now
+
+    @property
+    def is_paused(self) -> bool:
+        """
+        Get the flag indicating whether the whole scheduler is paused
+        """
+        return self.__paused
+
+    def is_group_paused(self, group) -> bool:
+        """
+        Check whether the timers of the group are paused
+        """
+        return group in self.__paused_groups
+
+    def __len__(self) -> int:
+        return len(self.__timers)
+
+    def __push(self, timer_id: int) -> None:
+        timer = self.__timers[timer_id]
+        self.__pushes += 1
+        timer[6] = self.__pushes
+        heapq.heappush(self.__queue, (timer[0], self.__pushes, timer_id))
+
+    def schedule(self, ticks: int, func, *args, every: int | None = None,
+                 times: int | None = None, group=None) -> int:
+        """
+        Call func(*args) the given number of ticks from now and return the
+        id of the timer.  With every, the call is repeated every that many
+        ticks, forever or the given number of times in total, e.g., to spawn
+        a wave of enemies.
+        """
+        if every is not None and every < 1:
+            raise ValueError("a repeating timer needs an interval of 1 tick or more")
+        self.__count += 1
+        timer_id = self.__count
+        due = self.__now + max(0, ticks)
+        self.__timers[timer_id] = [due, func, args, every, times, group, 0]
+        if group in self.__paused_groups:
+            self.__paused_groups[group][timer_id] = due - self.__now
+        else:
+            self.__push(timer_id)
+        return timer_id
+
+    def cancel(self, timer_id: int) -> None:
+        """
+        Cancel a timer; its queue entry is dropped when it comes up
+        """
+        timer = self.__timers.pop(timer_id, None)
+        if timer is not None and timer[5] in self.__paused_groups:
+            self.__paused_groups[timer[5]].pop(timer_id, None)
+
+    def cancel_group(self, group) -> None:
+        """
+        Cancel every timer of the group
+        """
+        for timer_id in [timer_id for timer_id, timer in self.__timers.items()
+                         if timer[5] is group]:
+            del self.__timers[timer_id]
+        self.__paused_groups.pop(group, None)
+
+    def clear(self) -> None:
+        """
+        Cancel every timer
+        """
+        self.__queue = []
+        self.__timers.clear()
+        self.__paused_groups.clear()
+
+    def pending(self, group) -> list[tuple[int, tuple]]:
+        """
+        Return (ticks remaining, args) of every timer of the group, soonest
+        first, e.g., to save the spawns still to come
+        """
+        paused = self.__paused_groups.get(group)
+        timers = [(paused[timer_id] if paused is not None else timer[0] - self.__now,
+                   timer[2])
+                  for timer_id, timer in self.__timers.items() if timer[5] is group]
+        return sorted(timers, key=lambda timer: timer[0])
+
+    def pause(self, group=None) -> None:
+        """
+        Stop the timers of the group from counting down, or the whole
+        scheduler when no group is given
+        """
+        if group is None:
+            self.__paused = True
+            return
+        if group in self.__paused_groups:
+            return
+        self.__paused_groups[group] = {
+            timer_id: timer[0] - self.__now
+            for timer_id, timer in self.__timers.items() if timer[5] is group
+        }
+        for timer_id in self.__paused_groups[group]:
+            self.__timers[timer_id][6] = 0
+
+    def resume(self, group=None) -> None:
+        """
+        Let the timers of the group, or the whole scheduler, count down again
+        from where they were paused
+        """
+        if group is None:
+            self.__paused = False
+            return
+        for timer_id, remaining in self.__paused_groups.pop(group, {}).items():
+            self.__timers[timer_id][0] = self.__now + remaining
+            self.__push(timer_id)
+
+    def advance(self) -> None:
+        """
+        Count one tick and call every timer that has become due
+        """
+        if self.__paused:
+            return
+        self.__now += 1
+        now = self.__now
+        queue = self.__queue
+        timers = self.__timers
+        while queue and queue[0][0] <= now:
+            due, entry, timer_id = heapq.heappop(queue)
+            timer = timers.get(timer_id)
+            # skip cancelled timers and stale entries of paused or resumed ones
+            if timer is None or timer[6] != entry:
+                continue
+            _, func, args, every, times, _, _ = timer
+            if every is None or times == 1:
+                del timers[timer_id]
+            else:
+                timer[0] = due + every
+                if times is not None:
+                    timer[4] = times - 1
+                self.__push(timer_id)
+            func(*args)
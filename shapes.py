@@ -0,0 +1,97 @@
+"""
+The shapes module provides a cache of turtle shape polygons already rotated
+to a heading and scaled to a screen, shared by every sprite drawing the same
+shape, so that turning a sprite costs a table lookup instead of rotating
+every point of its polygon.
+"""
+import math
+from collections import OrderedDict
+
+
+class ShapeCache:
+    """
+    Keep the canvas offsets of the points of turtle shape polygons from
+    their center, keyed by shape name, heading bucket and the screen's
+    y-to-x scale ratio, i.e., the distortion of the world coordinates.
+    Headings are rounded to the nearest of the given number of buckets per
+    full turn, and the least recently used polygons are evicted once the
+    cache holds its capacity.  A shape name is assumed to stand for the same
+    polygon on every screen.
+    """
+
+    def __init__(self, capacity: int = 4096, buckets: int = 720):
+        self.__capacity: int = capacity
+        self.__buckets: int = buckets
+        self.__polygons: OrderedDict[tuple, tuple[float, ...]] = OrderedDict()
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__evictions: int = 0
+
+    @property
+    def capacity(self) -> int:
+        """
+        Get the maximum number of polygons kept
+        """
+        return self.__capacity
+
+    @property
+    def buckets(self) -> int:
+        """
+        Get the number of heading buckets per full turn
+        """
+        return self.__buckets
+
+    def __len__(self) -> int:
+        return len(self.__polygons)
+
+    def offsets(self, shape: str, points: list[tuple[float, float]],
+                heading: float, scale: float) -> tuple[float, ...]:
+        """
+        Return the canvas offsets (dx1, dy1, dx2, dy2, ...) of the points of
+        the shape polygon turned to the heading, on a screen whose y scale
+        is the given multiple of its x scale.  The points are only used to
+        fill the cache when the polygon is not in it yet.
+        """
+        bucket = round(heading * self.__buckets / 360) % self.__buckets
+        key = (shape, bucket, scale)
+        polygons = self.__polygons
+        polygon = polygons.get(key)
+        if polygon is not None:
+            polygons.move_to_end(key)
+            self.__hits += 1
+            return polygon
+        self.__misses += 1
+        # same transformation as RawTurtle uses for its shape polygon
+        rad = math.radians(bucket * 360 / self.__buckets)
+        e0, e1 = math.cos(rad), math.sin(rad)*scale
+        norm = math.hypot(e0, e1)
+        e0, e1 = e0/norm, e1/norm
+        offsets: list[float] = []
+        for px, py in points:
+            offsets.append(e1*px + e0*py)
+            offsets.append(e0*px - e1*py)
+        polygon = polygons[key] = tuple(offsets)
+        if len(polygons) > self.__capacity:
+            polygons.popitem(last=False)
+            self.__evictions += 1
+        return polygon
+
+    def clear(self) -> None:
+        """
+        Forget every polygon, e.g., after a shape has been registered again
+        with other points
+        """
+        self.__polygons.clear()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Get the numbers of polygons cached, lookups served from the cache,
+        polygons computed and polygons evicted
+        """
+        return {
+            "size": len(self.__polygons),
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "evictions": self.__evictions,
+        }
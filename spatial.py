@@ -0,0 +1,173 @@
+"""
+The spatial module provides a uniform-grid spatial hash for answering
+overlap queries between game elements without testing every pair, and a
+segment-versus-box test for swept collisions.
+"""
+import math
+
+
+def segment_entry(x1: float, y1: float, x2: float, y2: float,
+                  bx1: float, by1: float, bx2: float, by2: float) -> float | None:
+    """
+    Return the fraction of the way from (x1, y1) to (x2, y2) at which the
+    segment enters the box (bx1, by1)-(bx2, by2), 0 if it starts inside,
+    or None if it misses the box
+    """
+    t_min, t_max = 0.0, 1.0
+    for start, delta, low, high in ((x1, x2 - x1, bx1, bx2),
+                                    (y1, y2 - y1, by1, by2)):
+        if delta == 0:
+            if not low <= start <= high:
+                return None
+            continue
+        t1, t2 = (low - start) / delta, (high - start) / delta
+        if t1 > t2:
+            t1, t2 = t2, t1
+        t_min, t_max = max(t_min, t1), min(t_max, t2)
+        if t_min > t_max:
+            return None
+    return t_min
+
+
+class SpatialHash:
+    """
+    Index axis-aligned bounding boxes of arbitrary objects in a uniform grid
+    covering the screen.  Boxes outside of the screen are kept in the border
+    cells, so queries stay correct for elements leaving the screen.
+    """
+
+    def __init__(self, width: float, height: float, cell_size: float = 50):
+        self.__cell_size: float = cell_size
+        self.__cols: int = max(1, math.ceil(width / cell_size))
+        self.__rows: int = max(1, math.ceil(height / cell_size))
+        self.__cells: dict[tuple[int, int], list] = {}
+        self.__boxes: dict[object, tuple] = {}
+        self.__spans: dict[object, tuple] = {}
+
+    @property
+    def cell_size(self) -> float:
+        """
+        Get the width and height of each grid cell
+        """
+        return self.__cell_size
+
+    def __len__(self) -> int:
+        return len(self.__boxes)
+
+    def __contains__(self, obj) -> bool:
+        return obj in self.__boxes
+
+    def __span(self, x1: float, y1: float, x2: float, y2: float) -> tuple:
+        size = self.__cell_size
+        last_col, last_row = self.__cols - 1, self.__rows - 1
+        return (min(max(int(x1 // size), 0), last_col),
+                min(max(int(y1 // size), 0), last_row),
+                min(max(int(x2 // size), 0), last_col),
+                min(max(int(y2 // size), 0), last_row))
+
+    def clear(self) -> None:
+        """
+        Remove every object from the index
+        """
+        self.__cells.clear()
+        self.__boxes.clear()
+        self.__spans.clear()
+
+    def insert(self, obj, x1: float, y1: float, x2: float, y2: float) -> None:
+        """
+        Add an object with the bounding box (x1, y1)-(x2, y2)
+        """
+        span = self.__span(x1, y1, x2, y2)
+        self.__boxes[obj] = (x1, y1, x2, y2)
+        self.__spans[obj] = span
+        cells = self.__cells
+        col1, row1, col2, row2 = span
+        for col in range(col1, col2+1):
+            for row in range(row1, row2+1):
+                cell = cells.get((col, row))
+                if cell is None:
+                    cells[(col, row)] = [obj]
+                else:
+                    cell.append(obj)
+
+    def remove(self, obj) -> None:
+        """
+        Remove an object from the index
+        """
+        del self.__boxes[obj]
+        col1, row1, col2, row2 = self.__spans.pop(obj)
+        for col in range(col1, col2+1):
+            for row in range(row1, row2+1):
+                self.__cells[(col, row)].remove(obj)
+
+    def move(self, obj, x1: float, y1: float, x2: float, y2: float) -> None:
+        """
+        Update the bounding box of an object, touching the grid only when
+        the object moves to other cells
+        """
+        if obj in self.__boxes and self.__spans[obj] == self.__span(x1, y1, x2, y2):
+            self.__boxes[obj] = (x1, y1, x2, y2)
+            return
+        if obj in self.__boxes:
+            self.remove(obj)
+        self.insert(obj, x1, y1, x2, y2)
+
+    def query_point(self, x: float, y: float) -> list:
+        """
+        Return all objects whose bounding boxes contain the point (x, y)
+        """
+        col, row, _, _ = self.__span(x, y, x, y)
+        boxes = self.__boxes
+        result = []
+        for obj in self.__cells.get((col, row), ()):
+            x1, y1, x2, y2 = boxes[obj]
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                result.append(obj)
+        return result
+
+    def query_box(self, x1: float, y1: float, x2: float, y2: float) -> list:
+        """
+        Return all objects whose bounding boxes overlap the box
+        (x1, y1)-(x2, y2)
+        """
+        col1, row1, col2, row2 = self.__span(x1, y1, x2, y2)
+        boxes = self.__boxes
+        cells = self.__cells
+        seen = set()
+        result = []
+        for col in range(col1, col2+1):
+            for row in range(row1, row2+1):
+                for obj in cells.get((col, row), ()):
+                    if obj in seen:
+                        continue
+                    seen.add(obj)
+                    ox1, oy1, ox2, oy2 = boxes[obj]
+                    if ox1 <= x2 and x1 <= ox2 and oy1 <= y2 and y1 <= oy2:
+                        result.append(obj)
+        return result
+
+    def query_object(self, obj) -> list:
+        """
+        Return all other indexed objects overlapping the given indexed object
+        """
+        return [other for other in self.query_box(*self.__boxes[obj])
+                if other is not obj]
+
+    def pairs(self):
+        """
+        Yield every pair of indexed objects whose bounding boxes overlap,
+        each pair exactly once
+        """
+        boxes = self.__boxes
+        seen = set()
+        for cell in self.__cells.values():
+            for i, obj in enumerate(cell):
+                ax1, ay1, ax2, ay2 = boxes[obj]
+                for other in cell[i+1:]:
+                    key = (id(obj), id(other)) if id(obj) < id(other) else (id(other), id(obj))
+                    if key in seen:
+                        continue
+                    bx1, by1, bx2, by2 = boxes[other]
+                    if ax1 <= bx2 and bx1 <= ax2 and ay1 <= by2 and by1 <= ay2:
+                        seen.add(key)
+                        yield obj, other
@@ -0,0 +1,216 @@
+"""
+The sweep module tunes the difficulty of the levels by playing many headless
+games with a bot player across all CPU cores.  Every combination of the
+given enemy speed scales and extra enemies per level is played on every
+level with a number of seeds, and the win rate, the mean time to reach home
+and the mean time to get hit are reported per level.
+
+Usage: python sweep.py [--levels L ...] [--games N] [--speed-scale S ...]
+                       [--extra-enemies E ...] [--bot {greedy,straight}]
+                       [--max-seconds T] [--processes P] [--out FILE]
+"""
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import sys
+import time
+from main import SCREEN_WIDTH, SCREEN_HEIGHT
+from turtle_adventure import (MAX_LEVEL, TurtleAdventureGame, Enemy,
+                              EnemyGenerator, DemoEnemy, RandomWalkEnemy,
+                              ChaseEnemy, FencingEnemy, SentryGun, Bullet)
+
+TUNED_ENEMIES: list[type[Enemy]] = [DemoEnemy, RandomWalkEnemy, ChaseEnemy,
+                                    FencingEnemy, SentryGun, Bullet]
+DEFAULT_SPEEDS = {cls: cls.SPEED for cls in TUNED_ENEMIES}
+DEFAULT_SPAWNS = list(EnemyGenerator.NUM_ENEMY_PER_LEVEL)
+
+# the bot clicks a new waypoint every few ticks, at most this far away
+BOT_INTERVAL = 3
+BOT_REACH = 40
+# how far the bot wants to stay from an enemy's edge
+BOT_CLEARANCE = 25
+# chunks of games a worker process plays before it is replaced; a chunk is
+# a quarter of a worker's share, so this costs a few process starts only
+MAX_TASKS_PER_CHILD = 1
+
+
+class SweepGame(TurtleAdventureGame): # pylint: disable=too-many-ancestors
+    """
+    A headless game that ends after a single level instead of moving on
+    """
+
+    def __init__(self, level: int, seed: int):
+        super().__init__(None, SCREEN_WIDTH, SCREEN_HEIGHT, level=level,
+                         headless=True, seed=seed)
+
+    def game_over_win(self) -> None:
+        self.stop()
+        self.outcome = "win"
+
+    def game_over_lose(self) -> None:
+        self.stop()
+        self.outcome = "lose"
+
+
+def apply_tuning(config: dict) -> None:
+    """
+    Scale the speeds of all enemies and change the number of enemies per
+    level, starting from the defaults, in the current process
+    """
+    scale = config["speed_scale"]
+    for cls, (base, swing) in DEFAULT_SPEEDS.items():
+        cls.SPEED = (base*scale, swing*scale)
+    EnemyGenerator.NUM_ENEMY_PER_LEVEL = [max(0, count + config["extra_enemies"])
+                                          for count in DEFAULT_SPAWNS]
+
+
+def segment_distance(x1: float, y1: float, x2: float, y2: float,
+                     px: float, py: float) -> float:
+    """
+    Return the distance from the point (px, py) to the segment
+    (x1, y1)-(x2, y2)
+    """
+    dx, dy = x2 - x1, y2 - y1
+    length2 = dx*dx + dy*dy
+    t = 0 if length2 == 0 else max(0, min(1, ((px-x1)*dx + (py-y1)*dy) / length2))
+    return math.hypot(x1 + t*dx - px, y1 + t*dy - py)
+
+
+def straight_bot(game: SweepGame) -> tuple[float, float]:
+    """
+    Head straight home, ignoring the enemies
+    """
+    return game.home.x, game.home.y
+
+
+def greedy_bot(game: SweepGame) -> tuple[float, float]:
+    """
+    Pick, among the points a short way off in every direction and home
+    itself, the one closest to home whose path keeps clear of the enemies
+    """
+    px, py = game.player.x, game.player.y
+    hx, hy = game.home.x, game.home.y
+    enemies = [(enemy.x, enemy.y, enemy.size/2 + BOT_CLEARANCE)
+               for enemy in game.entities.view(Enemy)]
+    reach = min(BOT_REACH, math.hypot(hx - px, hy - py))
+    candidates = [(hx, hy)] if reach < BOT_REACH else []
+    for i in range(16):
+        angle = i * math.pi / 8
+        candidates.append((px + reach*math.cos(angle), py + reach*math.sin(angle)))
+    best, best_score = (hx, hy), math.inf
+    for x, y in candidates:
+        x = min(max(x, 0), game.screen_width)
+        y = min(max(y, 0), game.screen_height)
+        danger = sum(max(0, clearance - segment_distance(px, py, x, y, ex, ey))
+                     for ex, ey, clearance in enemies)
+        score = math.hypot(hx - x, hy - y) + 20*danger
+        if score < best_score:
+            best, best_score = (x, y), score
+    return best
+
+
+BOTS = {"greedy": greedy_bot, "straight": straight_bot}
+
+
+def play(task: tuple) -> tuple:
+    """
+    Play one game of a task (config index, config, level, seed, bot name,
+    maximum ticks) and return (config index, level, outcome, seconds)
+    """
+    index, config, level, seed, bot, max_ticks = task
+    apply_tuning(config)
+    decide = BOTS[bot]
+    game = SweepGame(level, seed)
+    game.start()
+    while game.is_started and game.ticks < max_ticks:
+        if game.ticks % BOT_INTERVAL == 0:
+            game.click(*decide(game))
+        game.tick()
+    game.close()
+    return index, level, game.outcome or "timeout", game.time
+
+
+def sweep(configs: list[dict], levels: list[int], games: int, bot: str,
+          max_seconds: float, processes: int | None = None) -> list[dict]:
+    """
+    Play every config on every level with the given number of seeds in a
+    process pool, and return one summary per config and level
+    """
+    max_ticks = round(max_seconds * 1000 / SweepGame(0, 0).update_delay)
+    tasks = [(index, config, level, seed, bot, max_ticks)
+             for index, config in enumerate(configs)
+             for level in levels
+             for seed in range(games)]
+    outcomes: dict[tuple[int, int], list[tuple[str, float]]] = {}
+    context = multiprocessing.get_context("spawn")
+    # fresh workers now and then return whatever memory the games left behind
+    with context.Pool(processes, maxtasksperchild=MAX_TASKS_PER_CHILD) as pool:
+        for index, level, outcome, seconds in pool.imap_unordered(
+                play, tasks, chunksize=max(1, len(tasks) // (4*(processes or 8)))):
+            outcomes.setdefault((index, level), []).append((outcome, seconds))
+    summaries = []
+    for (index, level), results in sorted(outcomes.items()):
+        wins = [seconds for outcome, seconds in results if outcome == "win"]
+        deaths = [seconds for outcome, seconds in results if outcome == "lose"]
+        summaries.append({
+            **configs[index],
+            "level": level,
+            "games": len(results),
+            "win_rate": len(wins) / len(results),
+            "time_to_home": sum(wins) / len(wins) if wins else None,
+            "time_to_death": sum(deaths) / len(deaths) if deaths else None,
+            "timeouts": len(results) - len(wins) - len(deaths),
+        })
+    return summaries
+
+
+def main() -> int:
+    """
+    Run the sweep from the command line and return the exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--levels", type=int, nargs="+",
+                        default=list(range(MAX_LEVEL)), help="levels to play")
+    parser.add_argument("--games", type=int, default=50,
+                        help="games (seeds) per config and level")
+    parser.add_argument("--speed-scale", type=float, nargs="+", default=[1.0],
+                        help="factors applied to every enemy speed")
+    parser.add_argument("--extra-enemies", type=int, nargs="+", default=[0],
+                        help="enemies added to (or removed from) every level")
+    parser.add_argument("--bot", choices=BOTS, default="greedy",
+                        help="how the player is driven")
+    parser.add_argument("--max-seconds", type=float, default=60,
+                        help="game time after which a game counts as a timeout")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--out", help="also write the results to a JSON file")
+    args = parser.parse_args()
+
+    configs = [{"speed_scale": scale, "extra_enemies": extra}
+               for scale, extra in itertools.product(args.speed_scale,
+                                                     args.extra_enemies)]
+    start = time.perf_counter()
+    summaries = sweep(configs, args.levels, args.games, args.bot,
+                      args.max_seconds, args.processes)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'speed':>6}{'extra':>6}{'level':>6}{'games':>7}{'win %':>7}"
+          f"{'home s':>8}{'death s':>8}{'timeout':>8}")
+    for row in summaries:
+        home = f"{row['time_to_home']:.1f}" if row["time_to_home"] is not None else "-"
+        death = f"{row['time_to_death']:.1f}" if row["time_to_death"] is not None else "-"
+        print(f"{row['speed_scale']:>6.2f}{row['extra_enemies']:>6}{row['level']:>6}"
+              f"{row['games']:>7}{100*row['win_rate']:>7.1f}{home:>8}{death:>8}"
+              f"{row['timeouts']:>8}")
+    total = sum(row["games"] for row in summaries)
+    print(f"{total} games in {elapsed:.1f} s")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump(summaries, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,12 @@ import random
 import time
 import turtle
 from turtle import RawTurtle
-from gamelib import Game, GameElement
+from gamelib import Game, GameElement, Pool, Sprite
+from spatial import SpatialHash, segment_entry
+from flowfield import FlowField
+from kinematics import Body
+from batch import BatchEngine, BatchView
+from savestate import SaveState
 import math
 
 MAX_LEVEL = 10
@@ -28,6 +33,19 @@ class TurtleGameElement(GameElement):
         """
         return self.__game
 
+    def get_state(self) -> tuple[float, ...]:
+        """
+        Get the state of the element kept in snapshots of the game, as
+        numbers, starting with its position
+        """
+        return (self.x, self.y)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        """
+        Put the element back into a state returned by get_state()
+        """
+        self.x, self.y = state[0], state[1]
+
 
 class Waypoint(TurtleGameElement):
     """
@@ -41,8 +59,8 @@ class Waypoint(TurtleGameElement):
         self.__active: bool = False
 
     def create(self) -> None:
-        self.__id1 = self.canvas.create_line(0, 0, 0, 0, width=2, fill="green")
-        self.__id2 = self.canvas.create_line(0, 0, 0, 0, width=2, fill="green")
+        self.__id1 = self.track(self.canvas.create_line(0, 0, 0, 0, width=2, fill="green"))
+        self.__id2 = self.track(self.canvas.create_line(0, 0, 0, 0, width=2, fill="green"))
 
     def delete(self) -> None:
         self.canvas.delete(self.__id1)
@@ -77,6 +95,7 @@ class Waypoint(TurtleGameElement):
         Mark this waypoint as inactive.
         """
         self.__active = False
+        self.mark_dirty()
 
     @property
     def is_active(self) -> bool:
@@ -85,6 +104,16 @@ class Waypoint(TurtleGameElement):
         """
         return self.__active
 
+    def get_state(self) -> tuple[float, ...]:
+        return (*super().get_state(), self.__active)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        if state[2]:
+            self.activate(state[0], state[1])
+        else:
+            super().set_state(state)
+            self.deactivate()
+
 
 class Home(TurtleGameElement):
     """
@@ -109,9 +138,10 @@ class Home(TurtleGameElement):
     @size.setter
     def size(self, val: int) -> None:
         self.__size = val
+        self.mark_dirty()
 
     def create(self) -> None:
-        self.__id = self.canvas.create_rectangle(0, 0, 0, 0, outline="brown", width=2)
+        self.__id = self.track(self.canvas.create_rectangle(0, 0, 0, 0, outline="brown", width=2))
 
     def delete(self) -> None:
         self.canvas.delete(self.__id)
@@ -127,6 +157,21 @@ class Home(TurtleGameElement):
                            self.x + self.size/2,
                            self.y + self.size/2)
 
+    @property
+    def bbox(self) -> tuple[float, float, float, float]:
+        """
+        Get the bounding box of home as (x1, y1, x2, y2)
+        """
+        half = self.size/2
+        return (self.x-half, self.y-half, self.x+half, self.y+half)
+
+    def get_state(self) -> tuple[float, ...]:
+        return (*super().get_state(), self.__size)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        super().set_state(state)
+        self.size = state[2]
+
     def contains(self, x: float, y: float):
         """
         Check whether home contains the point (x, y).
@@ -141,17 +186,31 @@ class Player(TurtleGameElement):
     Represent the main player, implemented using Python's turtle.
     """
 
+    # draw the player with a Sprite, whose turned polygons are cached,
+    # instead of the game's RawTurtle
+    use_sprite: bool = True
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  turtle: RawTurtle,
                  speed: float = 5):
         super().__init__(game)
-        self.__speed: float = speed
+        # the speed is given in pixels per tick at the game's SPEED_DELAY
+        self.__speed: float = speed * game.speed_scale
         self.__turtle: RawTurtle = turtle
+        # the turtle only follows the body when the player is rendered
+        self.__body: Body = Body(turtle.xcor(), turtle.ycor(), turtle.heading())
 
     def create(self) -> None:
-        turtle = RawTurtle(self.canvas)
+        # reuse the turtle given by the game rather than leaving it behind
+        turtle = self.track(self.__turtle)
         turtle.getscreen().tracer(False) # disable turtle's built-in animation
+        if self.use_sprite:
+            # the hidden turtle is cleared from the canvas by the next screen
+            # refresh
+            turtle.hideturtle()
+            super().request_redraw()
+            turtle = self.track(Sprite(self.canvas, self.game.screen))
         turtle.shape("turtle")
         turtle.color("green")
         turtle.penup()
@@ -161,7 +220,7 @@ class Player(TurtleGameElement):
     @property
     def speed(self) -> float:
         """
-        Give the player's current speed.
+        Give the player's current speed in pixels per tick.
         """
         return self.__speed
 
@@ -172,42 +231,70 @@ class Player(TurtleGameElement):
     def delete(self) -> None:
         pass
 
+    def respawn(self, x: float, y: float) -> None:
+        """
+        Put the player back at (x, y) facing east, e.g., when a level starts
+        """
+        self.__body.heading = 0
+        self.x = x
+        self.y = y
+        self.save_state()
+
     def update(self) -> None:
-        # check if player has arrived home
-        if self.game.home.contains(self.x, self.y):
-            self.game.game_over_win()
-        turtle = self.__turtle
+        # arriving home is detected by the game's collision phase
+        body = self.__body
         waypoint = self.game.waypoint
-        if self.game.waypoint.is_active:
-            turtle.setheading(turtle.towards(waypoint.x, waypoint.y))
-            turtle.forward(self.speed)
-            if turtle.distance(waypoint.x, waypoint.y) < self.speed:
+        if waypoint.is_active:
+            body.face(waypoint.x, waypoint.y)
+            body.forward(self.speed)
+            self.mark_dirty()
+            if body.distance_to(waypoint.x, waypoint.y) < self.speed:
                 waypoint.deactivate()
 
     def render(self) -> None:
-        self.__turtle.goto(self.x, self.y)
-        self.__turtle.getscreen().update()
+        self.__turtle.setheading(self.__body.heading)
+        self.__turtle.goto(*self.render_position)
+        self.request_redraw()
+
+    def request_redraw(self) -> None:
+        if isinstance(self.__turtle, Sprite):
+            self.__turtle.draw()
+        else:
+            super().request_redraw()
 
+    @property
+    def heading(self) -> float:
+        """
+        Get the heading of the player in degrees
+        """
+        return self.__body.heading
 
-    # override original property x's getter/setter to use turtle's methods
-    # instead
+    def get_state(self) -> tuple[float, ...]:
+        return (*super().get_state(), self.__body.heading, self.__speed)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        super().set_state(state)
+        self.__body.heading, self.__speed = state[2], state[3]
+
+    # override original property x's getter/setter to use the body instead
     @property
     def x(self) -> float:
-        return self.__turtle.xcor()
+        return self.__body.x
 
     @x.setter
     def x(self, val: float) -> None:
-        self.__turtle.setx(val)
+        self.__body.x = val
+        self.mark_dirty()
 
-    # override original property y's getter/setter to use turtle's methods
-    # instead
+    # override original property y's getter/setter to use the body instead
     @property
     def y(self) -> float:
-        return self.__turtle.ycor()
+        return self.__body.y
 
     @y.setter
     def y(self, val: float) -> None:
-        self.__turtle.sety(val)
+        self.__body.y = val
+        self.mark_dirty()
 
 
 class Enemy(TurtleGameElement):
@@ -215,6 +302,15 @@ class Enemy(TurtleGameElement):
     Define an abstract enemy for the Turtle's adventure game
     """
 
+    # draw enemies with a lightweight Sprite instead of a RawTurtle; set to
+    # False in a subclass that needs the full turtle API
+    use_sprite: bool = True
+
+    # speed in pixels per tick at the game's SPEED_DELAY as (base, swing),
+    # giving the speed at a level as base + swing*sin(0.08*level); see
+    # speed_at() and level_speed
+    SPEED: tuple[float, float] = (0, 0)
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int,
@@ -223,10 +319,34 @@ class Enemy(TurtleGameElement):
         self.__size = size
         self.__color = color
         self.__turtle: RawTurtle
+        self.__view: BatchView | None = None
+        # position and heading while the enemy moves on its own; the turtle
+        # only follows them in sync_turtle()
+        self.__body: Body = Body()
+        self.__update_interval: int = 1
+        self.__last_update: int = game.ticks - 1
+        self.__elapsed: int = 1
 
     def set_spawn_point(self):
-        self.x = random.randint(0, self.game.screen_width)
-        self.y = random.randint(0, self.game.screen_height)
+        self.x = self.game.random.randint(0, self.game.screen_width)
+        self.y = self.game.random.randint(0, self.game.screen_height)
+
+    @classmethod
+    def speed_at(cls, level: int) -> float:
+        """
+        Get the speed of enemies of this class at the given level, in pixels
+        per tick at the game's SPEED_DELAY
+        """
+        base, swing = cls.SPEED
+        return base + swing*math.sin(level * 0.08)
+
+    @property
+    def level_speed(self) -> float:
+        """
+        Get the speed of the enemy at the game's level in pixels per tick,
+        scaled to the game's tick rate
+        """
+        return self.speed_at(self.game.level) * self.game.speed_scale
 
     @property
     def size(self) -> float:
@@ -242,73 +362,252 @@ class Enemy(TurtleGameElement):
         """
         return self.__color
 
-    def hits_player(self):
+    @property
+    def bbox(self) -> tuple[float, float, float, float]:
+        """
+        Get the bounding box of the enemy as (x1, y1, x2, y2)
+        """
+        x, y, half = self.x, self.y, self.size/2
+        return (x-half, y-half, x+half, y+half)
+
+    def new_turtle(self, shape: str) -> RawTurtle | Sprite:
+        """
+        Create the turtle drawing the enemy with the given shape, either a
+        Sprite or a RawTurtle depending on use_sprite
+        """
+        if self.use_sprite:
+            turtle = Sprite(self.canvas, self.game.screen)
+        else:
+            turtle = RawTurtle(self.game.screen)
+            turtle.getscreen().tracer(False)  # disable turtle's built-in animation
+        turtle.shape(shape)
+        turtle.color(self.color)
+        turtle.penup()
+        return self.track(turtle)
+
+    def delete(self) -> None:
+        self.leave_batch()
+        if isinstance(self.turtle, Sprite):
+            self.turtle.delete()
+        else:
+            self.turtle.clear()
+            self.turtle.hideturtle()
+
+    def request_redraw(self) -> None:
+        # a sprite redraws its single canvas item right away, while turtles
+        # wait for the game's screen refresh
+        if isinstance(self.turtle, Sprite):
+            self.turtle.draw()
+        else:
+            super().request_redraw()
+
+    @property
+    def is_dirty(self) -> bool:
+        # enemies move or turn on every tick they are updated, whether by
+        # themselves or by the batch engine, so they are rendered in every
+        # frame unless they are updated at a lower rate
+        return self.__lod[0] == 1 or super().is_dirty
+
+    @property
+    def is_near(self) -> bool:
+        """
+        Get the flag indicating whether the enemy is close enough to the
+        player or home to be updated at full rate and fully drawn
+        """
+        return self.game.is_near(self.x, self.y)
+
+    @property
+    def elapsed(self) -> int:
+        """
+        Get the number of ticks the current update of the enemy makes up
+        for, which is more than 1 for an enemy far from the player and home
+        """
+        return self.__lod[2]
+
+    @property
+    def __lod(self) -> tuple[int, int, int]:
+        # update interval, tick of the last update and ticks elapsed, kept
+        # by the batch engine while the enemy is batched
+        if self.__view is not None:
+            return self.__view.lod
+        return self.__update_interval, self.__last_update, self.__elapsed
+
+    def get_state(self) -> tuple[float, ...]:
+        return (*super().get_state(), self.heading, *self.__lod)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        super().set_state(state)
+        self.heading = state[2]
+        self.__update_interval = int(state[3])
+        self.__last_update, self.__elapsed = int(state[4]), int(state[5])
+        if self.__view is not None:
+            self.__view.lod = (self.__update_interval, self.__last_update,
+                               self.__elapsed)
+        self.mark_dirty()
+
+    def skips_update(self) -> bool:
+        """
+        Return True if the enemy is far from the player and home and waits
+        for its next update at the game's lower rate.  Otherwise, record the
+        ticks elapsed since the last update, by which the update scales its
+        motion, and choose the rate of the next updates.
         """
-        Check whether the enemy is hitting the player
+        ticks = self.game.ticks
+        elapsed = ticks - self.__last_update
+        if elapsed < self.__update_interval:
+            return True
+        self.__elapsed = elapsed
+        self.__last_update = ticks
+        self.__update_interval = 1 if self.is_near else self.game.LOD_INTERVAL
+        self.mark_dirty()
+        return False
+
+    def heading_to(self, x: float, y: float) -> float:
         """
-        return (
-            (self.x - self.size/2 < self.game.player.x < self.x + self.size/2)
-            and
-            (self.y - self.size/2 < self.game.player.y < self.y + self.size/2)
-        )
+        Get the heading in degrees from the enemy to the point (x, y)
+        """
+        view = self.__view
+        if view is not None:
+            return math.degrees(math.atan2(y - view.y, x - view.x)) % 360
+        return self.__body.heading_to(x, y)
+
+    @property
+    def body(self) -> Body:
+        """
+        Get the body keeping the enemy's state while it is not batched
+        """
+        return self.__body
+
+    def join_batch(self, kind: int, speed: float, radius: float = 0) -> None:
+        """
+        Move the position and heading of the enemy into the game's batch
+        engine, if the game uses one.  The engine then moves the enemy and
+        the turtle only follows it in sync_turtle().
+        """
+        if self.game.batch is not None and self.__view is None:
+            self.__view = self.game.batch.add(self, kind, self.x, self.y,
+                                              self.heading, speed, self.size,
+                                              radius)
+            self.__view.lod = (self.__update_interval, self.__last_update,
+                               self.__elapsed)
+
+    def leave_batch(self) -> None:
+        """
+        Remove the enemy from the batch engine
+        """
+        view = self.__view
+        if view is not None:
+            self.__body.x, self.__body.y = view.x, view.y
+            self.__body.heading = view.heading
+            self.__update_interval, self.__last_update, self.__elapsed = view.lod
+            view.release()
+            self.__view = None
+
+    @property
+    def view(self) -> BatchView | None:
+        """
+        Get the batch view keeping the enemy's state, or None if the enemy
+        moves on its own
+        """
+        return self.__view
+
+    @property
+    def is_batched(self) -> bool:
+        """
+        Get the flag indicating whether the enemy is moved by the batch engine
+        """
+        return self.__view is not None
+
+    def sync_turtle(self) -> None:
+        """
+        Move the turtle to the render position and heading of the enemy,
+        kept by either the batch engine or the body
+        """
+        self.turtle.goto(*self.render_position)
+        self.turtle.setheading(self.heading)
 
     @property
     def turtle(self):
         return self.__turtle
 
+    @property
+    def heading(self) -> float:
+        """
+        Get or set the heading of the enemy in degrees
+        """
+        if self.__view is not None:
+            return self.__view.heading
+        return self.__body.heading
+
+    @heading.setter
+    def heading(self, val: float) -> None:
+        if self.__view is not None:
+            self.__view.heading = val
+        else:
+            self.__body.heading = val
+
     @property
     def x(self):
-        return self.turtle.xcor()
+        if self.__view is not None:
+            return self.__view.x
+        return self.__body.x
 
     @x.setter
     def x(self, val):
-        self.turtle.setx(val)
+        if self.__view is not None:
+            self.__view.x = val
+        else:
+            self.__body.x = val
 
     @property
     def y(self):
-        return self.turtle.ycor()
+        if self.__view is not None:
+            return self.__view.y
+        return self.__body.y
 
     @y.setter
     def y(self, val):
-        self.turtle.sety(val)
+        if self.__view is not None:
+            self.__view.y = val
+        else:
+            self.__body.y = val
 
 
 # * Define your enemy classes
 # * Implement all methods required by the GameElement abstract class
 # * Define enemy's update logic in the update() method
-# * Check whether the player hits this enemy, then call the
-#   self.game.game_over_lose() method in the TurtleAdventureGame class.
+# * Hitting the player is detected by the game's collision phase, which
+#   calls the self.game.game_over_lose() method in the TurtleAdventureGame
+#   class.
 class DemoEnemy(Enemy):
     """
     Demo enemy
     """
 
+    SPEED = (3.5, 2)
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int,
                  color: str = 'green'):
         super().__init__(game, size, color)
-        self.__speed = 3.5 + 2*math.sin(self.game.level * 0.08)
-        self.__randseed = random.randint(0,100)
+        self.__speed = self.level_speed
+        self.__randseed = self.game.random.randint(0,100)
 
     def create(self) -> None:
-        turtle = RawTurtle(self.canvas)
-        turtle.getscreen().tracer(False)  # disable turtle's built-in animation
-        turtle.shape("circle")
-        turtle.color(self.color)
-        turtle.penup()
+        turtle = self.new_turtle("circle")
         self.__turtle = turtle
 
     def update(self) -> None:
+        if self.skips_update():
+            return
         if self.detect():
-            self.__turtle.setheading(self.__turtle.towards(self.game.player.x, self.game.player.y))
+            self.heading = self.heading_to(self.game.player.x, self.game.player.y)
             self.turtle.color('red')
         else:
-            self.__turtle.setheading(self.randheading)
+            self.heading = self.randheading
             self.turtle.color('blue')
-        self.__turtle.forward(self.movespeed)
-        if self.hits_player():
-            self.game.game_over_lose()
+        self.body.forward(self.movespeed * self.elapsed)
 
     @property
     def movespeed(self):
@@ -317,14 +616,18 @@ class DemoEnemy(Enemy):
         return self.__speed
 
     def render(self) -> None:
-        self.x, self.y = self.turtle.xcor(), self.turtle.ycor()
-        self.__turtle.getscreen().update()
+        self.sync_turtle()
+        self.request_redraw()
 
     def detect(self):
-        return self.turtle.distance(self.game.player.x, self.game.player.y) < 100
+        return self.body.distance_to(self.game.player.x, self.game.player.y) < 100
 
-    def delete(self) -> None:
-        pass
+    def get_state(self) -> tuple[float, ...]:
+        return (*super().get_state(), self.__speed, self.__randseed)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        super().set_state(state)
+        self.__speed, self.__randseed = state[6], int(state[7])
 
     @property
     def turtle(self):
@@ -332,12 +635,15 @@ class DemoEnemy(Enemy):
 
     @property
     def randheading(self):
-        random.seed((self.__randseed + datetime.now().second) // 3)
+        # the same point for 3 seconds of game time, drawn from a generator
+        # of its own so that games replay the same and the global one is
+        # left alone
+        rand = random.Random((self.__randseed + int(self.game.time)) // 3)
         width = self.game.screen_width
         height = self.game.screen_height
-        rand_x = random.randint(width//10, width*9//10)
-        rand_y = random.randint(height//10, height*9//10)
-        return self.turtle.towards(rand_x, rand_y)
+        rand_x = rand.randint(width//10, width*9//10)
+        rand_y = rand.randint(height//10, height*9//10)
+        return self.heading_to(rand_x, rand_y)
 
 
 class RandomWalkEnemy(Enemy):
@@ -345,56 +651,85 @@ class RandomWalkEnemy(Enemy):
     RandomWalk enemy
     """
 
+    SPEED = (10, 3)
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int = 50,
                  color: str = 'blue'):
         super().__init__(game, size, color)
-        self.__speed = 10 + 3 * math.sin(self.game.level * 0.08)
-        self.__randseed = random.randint(0, 100)
+        self.__speed = self.level_speed
+        self.__randseed = self.game.random.randint(0, 100)
+        # the path to the target is one persistent line below the enemy,
+        # created with it
+        self.__path: int | None = None
+        self.__drawn_path: tuple | None = None
+        self.__path_shown: bool = True
+        self.rand_point: tuple[float, float] = (0, 0)
 
     def create(self) -> None:
-        turtle = RawTurtle(self.canvas)
-        turtle.getscreen().tracer(False)  # disable turtle's built-in animation
-        turtle.shape("circle")
-        turtle.color(self.color)
-        turtle.penup()
+        self.__path = self.track(self.canvas.create_line(0, 0, 0, 0,
+                                                         fill="red", width=1))
+        turtle = self.new_turtle("circle")
         self.__turtle = turtle
         self.new_rand_point()
         self.set_spawn_point()
-        self.turtle.setheading(self.turtle.towards(self.rand_point))
+        self.heading = self.heading_to(*self.rand_point)
         self.draw_path()
-
+        self.join_batch(BatchEngine.WALK, self.__speed)
+        if self.is_batched:
+            self.view.target = self.rand_point
 
     def update(self) -> None:
-        if self.distance_to_rand_point < self.__speed:
-            self.new_rand_point()
-            self.turtle.setheading(self.turtle.towards(self.rand_point))
-        self.turtle.forward(self.__speed)
-        self.turtle.clear()
-        self.draw_path()
-        if self.hits_player():
-            self.game.game_over_lose()
+        if self.is_batched or self.skips_update():
+            return
+        step = self.__speed * self.elapsed
+        if self.distance_to_rand_point < step:
+            self.retarget()
+        self.body.forward(step)
+
+    def retarget(self) -> None:
+        """
+        Pick a new random point and head to it
+        """
+        self.new_rand_point()
+        self.heading = self.heading_to(*self.rand_point)
+        if self.is_batched:
+            self.view.target = self.rand_point
 
     def draw_path(self):
-        self.turtle.pendown()
-        self.turtle.pencolor('red')
-        self.turtle.pensize(1)
-        distance = self.distance_to_rand_point
-        self.turtle.forward(distance)
-        self.reset_pen()
-        self.turtle.back(distance)
-
-    def reset_pen(self):
-        self.turtle.penup()
-        self.turtle.pencolor(self.color)
-        self.turtle.pensize(self.size)
+        """
+        Move the ends of the path line to the enemy and its target, only if
+        either of them has changed since the line was last drawn
+        """
+        if not self.__path_shown:
+            self.canvas.itemconfigure(self.__path, state="normal")
+            self.__path_shown = True
+        path = (*self.render_position, *self.rand_point)
+        if path != self.__drawn_path:
+            # place the line exactly where the turtle pen would have drawn it
+            xscale, yscale = self.game.screen.xscale, -self.game.screen.yscale
+            self.canvas.coords(self.__path,
+                               path[0]*xscale, path[1]*yscale,
+                               path[2]*xscale, path[3]*yscale)
+            self.__drawn_path = path
+
+    def hide_path(self):
+        """
+        Hide the path line, e.g., while the enemy is far from the player
+        """
+        if self.__path_shown:
+            self.canvas.itemconfigure(self.__path, state="hidden")
+            self.__path_shown = False
 
     def render(self) -> None:
-        self.__turtle.getscreen().update()
-
-    def delete(self) -> None:
-        self.turtle.screen.clear()
+        self.sync_turtle()
+        # the path is only worth drawing near the player or home
+        if self.is_near:
+            self.draw_path()
+        else:
+            self.hide_path()
+        self.request_redraw()
 
     def new_rand_point(self):
         x_margin = 300
@@ -403,13 +738,25 @@ class RandomWalkEnemy(Enemy):
         height = self.game.screen_height
         x_range = (int(max(0,self.x - x_margin)), int(min(width, self.x + x_margin)))
         y_range = (int(max(0,self.y - y_margin)), int(min(height, self.y + y_margin)))
-        rand_x = random.randint(*x_range)
-        rand_y = random.randint(*y_range)
+        rand_x = self.game.random.randint(*x_range)
+        rand_y = self.game.random.randint(*y_range)
         self.rand_point = (rand_x, rand_y)
 
     @property
     def distance_to_rand_point(self):
-        return self.turtle.distance(self.rand_point)
+        return self.body.distance_to(*self.rand_point)
+
+    def get_state(self) -> tuple[float, ...]:
+        return (*super().get_state(), self.__speed, self.__randseed,
+                *self.rand_point)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        super().set_state(state)
+        self.__speed, self.__randseed = state[6], int(state[7])
+        self.rand_point = (state[8], state[9])
+        if self.is_batched:
+            self.view.speed = self.__speed
+            self.view.target = self.rand_point
 
     @property
     def turtle(self):
@@ -421,35 +768,44 @@ class ChaseEnemy(Enemy):
     Chase enemy
     """
 
+    SPEED = (3.5, 2)
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int = 20,
                  color: str = 'red'):
         super().__init__(game, size, color)
-        self.__speed = 3.5 + 2*math.sin(self.game.level * 0.08)
+        self.__speed = self.level_speed
 
     def create(self) -> None:
-        turtle = RawTurtle(self.canvas)
-        turtle.getscreen().tracer(False)  # disable turtle's built-in animation
-        turtle.shape("circle")
-        turtle.color(self.color)
-        turtle.penup()
+        turtle = self.new_turtle("circle")
         self.__turtle = turtle
         self.set_spawn_point()
+        self.join_batch(BatchEngine.CHASE, self.__speed)
 
     def update(self) -> None:
-        self.__turtle.setheading(self.__turtle.towards(self.game.player.x, self.game.player.y))
-        self.turtle.color('red')
-        self.__turtle.forward(self.__speed)
-        if self.hits_player():
-            self.game.game_over_lose()
+        if self.is_batched or self.skips_update():
+            return
+        # the first chaser of the tick rebuilds the shared field if needed
+        aim = self.game.flow_field.aim(self.x, self.y)
+        if aim is None:
+            aim = (self.game.player.x, self.game.player.y)
+        body = self.body
+        body.face(*aim)
+        body.forward(self.__speed * self.elapsed)
 
     def render(self) -> None:
-        self.x, self.y = self.turtle.xcor(), self.turtle.ycor()
-        self.__turtle.getscreen().update()
+        self.sync_turtle()
+        self.request_redraw()
 
-    def delete(self) -> None:
-        pass
+    def get_state(self) -> tuple[float, ...]:
+        return (*super().get_state(), self.__speed)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        super().set_state(state)
+        self.__speed = state[6]
+        if self.is_batched:
+            self.view.speed = self.__speed
 
     @property
     def turtle(self):
@@ -461,42 +817,49 @@ class FencingEnemy(Enemy):
     Fencing enemy
     """
 
+    SPEED = (7, 3)
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int = 20,
                  color: str = 'grey'):
         super().__init__(game, size, color)
-        self.__speed = 7 + 3 * math.sin(self.game.level * 0.08)
+        self.__speed = self.level_speed
         self.radius = 50
 
     def create(self) -> None:
-        turtle = RawTurtle(self.canvas)
-        turtle.getscreen().tracer(False)  # disable turtle's built-in animation
-        turtle.shape("circle")
-        turtle.color(self.color)
-        turtle.penup()
+        turtle = self.new_turtle("circle")
         self.__turtle = turtle
         self.set_spawn_point()
-        self.turtle.setheading(0)
+        self.heading = 0
+        self.join_batch(BatchEngine.FENCE, self.__speed, self.radius)
 
     def set_spawn_point(self):
         self.x = self.game.home.x - self.radius
         self.y = self.game.home.y - self.radius
 
     def update(self) -> None:
-        if (abs(self.game.home.x - self.x) > self.radius or
-            abs(self.game.home.y - self.y) > self.radius) :
-            self.turtle.back(self.__speed)
-            self.turtle.left(90)
-        self.turtle.forward(self.__speed)
-        if self.hits_player():
-            self.game.game_over_lose()
+        if self.is_batched:
+            return
+        body = self.body
+        if (abs(self.game.home.x - body.x) > self.radius or
+            abs(self.game.home.y - body.y) > self.radius) :
+            body.forward(-self.__speed)
+            body.turn(90)
+        body.forward(self.__speed)
 
     def render(self) -> None:
-        self.__turtle.getscreen().update()
+        self.sync_turtle()
+        self.request_redraw()
 
-    def delete(self) -> None:
-        pass
+    def get_state(self) -> tuple[float, ...]:
+        return (*super().get_state(), self.__speed, self.radius)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        super().set_state(state)
+        self.__speed, self.radius = state[6], state[7]
+        if self.is_batched:
+            self.view.speed = self.__speed
 
     @property
     def turtle(self):
@@ -508,55 +871,107 @@ class SentryGun(Enemy):
     SentryGun enemy
     """
 
+    SPEED = (12, 5)
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int = 20,
-                 color: str = 'blue'):
+                 color: str = 'blue',
+                 max_bullets: int = 10,
+                 interval: float = 1.5):
         super().__init__(game, size, color)
-        self.__speed = 12 + 5 * math.sin(self.game.level * 0.08)
-        self.__last_bullet = time.monotonic()
-        self.__interval = 1.5
-        self.__bullets = []
+        self.__speed = self.level_speed
+        self.__last_bullet = self.game.time
+        self.__interval = interval
+        self.__max_bullets = max_bullets
+        # an insertion-ordered dict, so that bullets are forgotten in O(1)
+        self.__bullets: dict[Bullet, None] = {}
 
     def create(self) -> None:
-        turtle = RawTurtle(self.canvas)
-        turtle.getscreen().tracer(False)  # disable turtle's built-in animation
-        turtle.shape("triangle")
-        turtle.color(self.color)
-        turtle.penup()
+        turtle = self.new_turtle("triangle")
         self.__turtle = turtle
         self.set_spawn_point()
-        self.turtle.setheading(270)
+        self.heading = 270
 
     def set_spawn_point(self):
         self.x = self.game.screen_width/2
         self.y = self.game.screen_height/2
 
     def update(self) -> None:
+        # the gun stays far from the player most of the time, but its aim and
+        # rate of fire are part of the difficulty, so it runs at full rate
         self.turn_to_player()
-        if time.monotonic() - self.__last_bullet > self.__interval:
+        if self.game.time - self.__last_bullet > self.__interval:
             self.fire()
-            self.__last_bullet = time.monotonic()
-        for bullet in self.__bullets:
-            bullet.update()
-            if bullet.out_screen():
-                self.__bullets.remove(bullet)
-                del bullet
-        print(len(self.__bullets))
+            self.__last_bullet = self.game.time
+
     def turn_to_player(self):
-        self.turtle.setheading(self.__turtle.towards(self.game.player.x, self.game.player.y))
+        self.body.face(self.game.player.x, self.game.player.y)
+
+    @property
+    def bullets(self) -> list["Bullet"]:
+        """
+        Get the bullets fired by this gun that are still on the screen
+        """
+        return list(self.__bullets)
+
+    @property
+    def max_bullets(self) -> int:
+        """
+        Get or set the maximum number of bullets of this gun on the screen
+        """
+        return self.__max_bullets
+
+    @max_bullets.setter
+    def max_bullets(self, val: int) -> None:
+        self.__max_bullets = val
 
     def fire(self):
-        bullet = Bullet(self.game, self.x, self.y, self.turtle.heading())
-        self.__bullets += [bullet]
+        """
+        Launch a bullet from the game's bullet pool, unless this gun already
+        has too many bullets on the screen or the pool is exhausted
+        """
+        if len(self.__bullets) >= self.__max_bullets:
+            return
+        self.launch_bullet(self.x, self.y, self.heading)
+
+    def launch_bullet(self, x: float, y: float, heading: float) -> "Bullet | None":
+        """
+        Launch a bullet of this gun from the game's bullet pool at (x, y)
+        toward the heading and return it, or None if the pool is exhausted
+        """
+        bullet = self.game.bullet_pool.acquire()
+        if bullet is None:
+            return None
+        bullet.launch(x, y, heading, gun=self)
+        self.__bullets[bullet] = None
+        return bullet
+
+    def recycle(self, bullet: "Bullet") -> None:
+        """
+        Hide a bullet and give it back to the game's bullet pool
+        """
+        del self.__bullets[bullet]
+        bullet.retire()
+        self.game.bullet_pool.release(bullet)
 
     def render(self) -> None:
-        self.__turtle.getscreen().update()
-        for bullet in self.__bullets:
-            bullet.render()
+        self.sync_turtle()
+        self.request_redraw()
 
     def delete(self) -> None:
-        pass
+        for bullet in list(self.__bullets):
+            self.recycle(bullet)
+        super().delete()
+
+    def get_state(self) -> tuple[float, ...]:
+        return (*super().get_state(), self.__speed, self.__last_bullet,
+                self.__interval, self.__max_bullets)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        super().set_state(state)
+        self.__speed, self.__last_bullet, self.__interval = state[6:9]
+        self.__max_bullets = int(state[9])
 
     @property
     def turtle(self):
@@ -564,35 +979,77 @@ class SentryGun(Enemy):
 
 
 class Bullet(Enemy):
+    """
+    Bullet fired by SentryGun.  Bullets are reused through the game's bullet
+    pool, so they are launched and retired rather than created and deleted;
+    a launched bullet is in the game's entity store until it is retired.
+    """
+
+    SPEED = (10, 3)
+
     def __init__(self,
                  game: "TurtleAdventureGame",
-                 x: float,
-                 y:float,
-                 heading: float,
+                 x: float = 0,
+                 y: float = 0,
+                 heading: float = 0,
                  size: int = 15,
                  color: str = 'black'):
         super().__init__(game, size, color)
-        self.__speed = 10 + 3 * math.sin(self.game.level * 0.08)
+        self.__speed = self.level_speed
         self.__heading = heading
+        self.__gun: SentryGun | None = None
         self.create()
-        self.set_spawn_point(x,y)
+        self.launch(x, y, heading)
+
+    def launch(self, x: float, y: float, heading: float,
+               gun: SentryGun | None = None) -> None:
+        """
+        Show the bullet at (x, y) moving toward the given heading, at the
+        speed of the current level.  The gun, if given, recycles the bullet
+        once it leaves the screen.
+        """
+        self.__speed = self.level_speed
+        self.__gun = gun
+        self.set_spawn_point(x, y)
+        self.heading = heading
+        self.join_batch(BatchEngine.STRAIGHT, self.__speed)
+        self.save_state()
+        self.turtle.showturtle()
+        self.game.entities.add(self)
+
+    @property
+    def gun(self) -> SentryGun | None:
+        """
+        Get the gun that launched the bullet, or None
+        """
+        return self.__gun
+
+    def retire(self) -> None:
+        """
+        Hide the bullet and stop moving it until it is launched again
+        """
+        self.__gun = None
+        self.leave_batch()
+        self.turtle.hideturtle()
+        self.game.entities.remove(self)
 
     def create(self) -> None:
-        turtle = RawTurtle(self.canvas)
-        turtle.getscreen().tracer(False)  # disable turtle's built-in animation
-        turtle.shape("turtle")
-        turtle.color(self.color)
-        turtle.penup()
+        turtle = self.new_turtle("turtle")
         self.__turtle = turtle
-        self.turtle.setheading(self.__heading)
+        self.heading = self.__heading
 
     def update(self) -> None:
-        self.turtle.forward(self.__speed)
-        if self.hits_player():
-            self.game.game_over_lose()
+        if not self.is_batched:
+            self.body.forward(self.__speed)
+        if self.out_screen():
+            if self.__gun is not None:
+                self.__gun.recycle(self)
+            else:
+                self.retire()
 
     def render(self) -> None:
-        self.__turtle.getscreen().update()
+        self.sync_turtle()
+        self.request_redraw()
 
     def set_spawn_point(self,x,y):
         self.x = x
@@ -602,8 +1059,14 @@ class Bullet(Enemy):
         return not (-10 < self.x < self.game.screen_width+10 and
                     -10 < self.y < self.game.screen_height+10)
 
-    def delete(self) -> None:
-        pass
+    def get_state(self) -> tuple[float, ...]:
+        return (*super().get_state(), self.__speed)
+
+    def set_state(self, state: tuple[float, ...]) -> None:
+        super().set_state(state)
+        self.__speed = state[6]
+        if self.is_batched:
+            self.view.speed = self.__speed
 
     @property
     def turtle(self):
@@ -614,8 +1077,8 @@ class Bullet(Enemy):
 # based on the given game level; call TurtleAdventureGame's add_enemy() method
 # to add enemies to the game at certain points in time.
 #
-# Hint: the 'game' parameter is a tkinter's frame, so it's after()
-# method can be used to schedule some future events.
+# Hint: the 'game' parameter's after_ticks() method can be used to schedule
+# some future events in simulation time.
 
 class EnemyGenerator:
     """
@@ -629,8 +1092,62 @@ class EnemyGenerator:
         self.__game: TurtleAdventureGame = game
         self.__level: int = level
 
-        for i in range(EnemyGenerator.NUM_ENEMY_PER_LEVEL[level]):
-            self.__game.after(i*1000, lambda i=i: self.create_enemy(i))
+        # spawn one enemy per second of simulation time
+        ticks_per_second = 1000 / self.__game.update_delay
+        self.__spawn_table: list[tuple[int, int]] = [
+            (round(i*ticks_per_second), i)
+            for i in range(EnemyGenerator.NUM_ENEMY_PER_LEVEL[level])
+        ]
+
+    @property
+    def spawn_table(self) -> list[tuple[int, int]]:
+        """
+        Get the spawns of the level as (tick offset, enemy type index) pairs
+        """
+        return self.__spawn_table
+
+    def start(self, spawns: list[tuple[int, int]] | None = None) -> None:
+        """
+        Schedule the spawns relative to the current tick, either the whole
+        spawn table or the given (ticks, enemy type index) pairs, e.g., the
+        spawns still to come in a saved game
+        """
+        for ticks, i in self.__spawn_table if spawns is None else spawns:
+            self.__game.after_ticks(ticks, self.create_enemy, i, group=self)
+
+    def pending(self) -> list[tuple[int, int]]:
+        """
+        Get the spawns that have not happened yet as (ticks from now, enemy
+        type index) pairs
+        """
+        return [(ticks, args[0])
+                for ticks, args in self.__game.scheduler.pending(self)]
+
+    def stop(self) -> None:
+        """
+        Cancel the spawns that have not happened yet, e.g., when the level
+        ends
+        """
+        self.__game.scheduler.cancel_group(self)
+
+    def pause(self) -> None:
+        """
+        Hold the remaining spawns until resume() is called
+        """
+        self.__game.scheduler.pause(self)
+
+    def resume(self) -> None:
+        """
+        Continue the spawns from where they were paused
+        """
+        self.__game.scheduler.resume(self)
+
+    @property
+    def is_paused(self) -> bool:
+        """
+        Get the flag indicating whether the spawns are paused
+        """
+        return self.__game.scheduler.is_group_paused(self)
 
     @property
     def game(self) -> "TurtleAdventureGame":
@@ -650,7 +1167,9 @@ class EnemyGenerator:
         """
         Create a new enemy, possibly based on the game level
         """
-        new_enemy = EnemyGenerator.ENEMY_TYPE[i](self.game)
+        # levels may be tuned to spawn more enemies than there are types
+        kind = EnemyGenerator.ENEMY_TYPE[i % len(EnemyGenerator.ENEMY_TYPE)]
+        new_enemy = kind(self.game)
         self.__game.add_enemy(new_enemy)
 
 
@@ -659,21 +1178,62 @@ class TurtleAdventureGame(Game): # pylint: disable=too-many-ancestors
     The main class for Turtle's Adventure.
     """
 
+    BULLET_POOL_CAPACITY = 64
+    # collisions are tested along the paths of the player and the enemies
+    # from the start of each tick
+    save_previous_states = True
+    # element classes in snapshots, by their index
+    SNAPSHOT_KINDS: list[type[TurtleGameElement]] = [
+        Waypoint, Home, Player, DemoEnemy, RandomWalkEnemy, ChaseEnemy,
+        FencingEnemy, SentryGun, Bullet]
+    # demo, random walking and chasing enemies farther than LOD_RADIUS from
+    # both the player and home are updated every LOD_INTERVAL ticks only;
+    # set LOD_INTERVAL to 1 to update every enemy on every tick
+    LOD_RADIUS = 200
+    LOD_INTERVAL = 4
+    # speeds are given in pixels per tick at this update delay and scaled to
+    # the actual one, so that the game plays the same at any tick rate
+    SPEED_DELAY = 33
+
     # pylint: disable=too-many-instance-attributes
-    def __init__(self, parent, screen_width: int, screen_height: int, level: int = 1):
+    def __init__(self, parent, screen_width: int, screen_height: int, level: int = 1,
+                 headless: bool = False, batch: bool = False, seed: int | None = None,
+                 threaded: bool = False, update_delay: int = 33,
+                 frame_delay: int | None = None):
         self.level: int = level
+        # every random decision of the game comes from this generator, so
+        # that a game can be reproduced from its seed and inputs
+        if seed is not None and not 0 <= seed < 2**32:
+            # snapshots and recordings store it in 32 bits
+            raise ValueError(f"seed {seed} is not an unsigned 32-bit integer")
+        self.seed: int = seed if seed is not None else random.randrange(2**32)
+        self.random = random.Random(self.seed)
+        self.recorder = None
+        self.outcome: str | None = None
+        self.__message: int | None = None
         self.screen_width: int = screen_width
         self.screen_height: int = screen_height
         self.waypoint: Waypoint
         self.player: Player
         self.home: Home
-        self.enemies: list[Enemy] = []
         self.enemy_generator: EnemyGenerator
-        super().__init__(parent)
+        self.next_enemy_generator: EnemyGenerator | None = None
+        self.transition_times: list[float] = []
+        self.batch: BatchEngine | None = None
+        self.bullet_pool: Pool
+        self.__use_batch = batch
+        self.spatial_index = SpatialHash(screen_width, screen_height)
+        self.flow_field = FlowField(screen_width, screen_height)
+        super().__init__(parent, update_delay=update_delay, headless=headless,
+                         threaded=threaded, frame_delay=frame_delay)
 
     def init_game(self):
         self.canvas.config(width=self.screen_width, height=self.screen_height)
-        turtle = RawTurtle(self.canvas)
+        if self.__use_batch:
+            self.batch = BatchEngine()
+        self.bullet_pool = Pool(lambda: Bullet(self),
+                                capacity=self.BULLET_POOL_CAPACITY)
+        turtle = RawTurtle(self.screen)
         # set turtle screen's origin to the top-left corner
         turtle.screen.setworldcoordinates(0, self.screen_height-1, self.screen_width-1, 0)
 
@@ -681,55 +1241,287 @@ class TurtleAdventureGame(Game): # pylint: disable=too-many-ancestors
         self.add_element(self.waypoint)
         self.home = Home(self, (self.screen_width-100, self.screen_height//2), 20)
         self.add_element(self.home)
+        # chasers go around home, keeping half their size away from it
+        self.flow_field.add_obstacle(*self.home.bbox, margin=10)
         self.player = Player(self, turtle)
         self.add_element(self.player)
-        self.canvas.bind("<Button-1>", lambda e: self.waypoint.activate(e.x, e.y))
+        self.canvas.bind("<Button-1>", lambda e: self.click(e.x, e.y))
+
+        self.start_level(EnemyGenerator(self, level=self.level))
+
+    def start_level(self, generator: "EnemyGenerator") -> None:
+        """
+        Put the persistent elements back to their initial state and start
+        spawning the enemies of the current level, while preparing the spawn
+        table of the next level ahead of time
+        """
+        self.waypoint.deactivate()
+        self.player.respawn(50, self.screen_height//2)
+        self.__start_spawning(generator)
+
+    def __start_spawning(self, generator: "EnemyGenerator",
+                         spawns: list[tuple[int, int]] | None = None,
+                         paused: bool = False) -> None:
+        # spawn the level's enemies, or the given spawns of a saved game,
+        # and prepare the spawn table of the next level
+        self.enemy_generator = generator
+        generator.start(spawns)
+        if paused:
+            generator.pause()
+        if self.level+1 < MAX_LEVEL:
+            self.next_enemy_generator = EnemyGenerator(self, level=self.level+1)
+        else:
+            self.next_enemy_generator = None
 
-        self.enemy_generator = EnemyGenerator(self, level=self.level)
+    def next_level(self) -> None:
+        """
+        Move on to the next level, keeping waypoint, home and player, and
+        record how long the transition took in milliseconds
+        """
+        start = time.perf_counter()
+        self.clear_enemies()
+        self.enemy_generator.stop()
+        self.level += 1
+        self.start_level(self.next_enemy_generator)
+        self.transition_times.append((time.perf_counter() - start) * 1000)
+
+    def click(self, x: float, y: float) -> None:
+        """
+        Move the waypoint to where the player clicked, and log the click with
+        the current tick if the game is being recorded
+        """
+        if self.recorder is not None:
+            self.recorder.record(self.ticks, x, y)
+        self.waypoint.activate(x, y)
+
+    @property
+    def enemies(self) -> list[Enemy]:
+        """
+        Get the live list of enemies in the game, not including bullets
+        """
+        return self.entities.view(Enemy, exclude=Bullet)
+
+    @property
+    def bullets(self) -> list[Bullet]:
+        """
+        Get the live list of bullets on the screen
+        """
+        return self.entities.view(Bullet)
+
+    @property
+    def speed_scale(self) -> float:
+        """
+        Get the factor turning speeds in pixels per tick at SPEED_DELAY into
+        speeds at the game's update delay
+        """
+        return self.update_delay / self.SPEED_DELAY
 
-        self.player.x = 50
-        self.player.y = self.screen_height//2
+    def is_near(self, x: float, y: float) -> bool:
+        """
+        Check whether the point (x, y) is within LOD_RADIUS of the player or
+        home
+        """
+        radius2 = self.LOD_RADIUS * self.LOD_RADIUS
+        dx, dy = x - self.player.x, y - self.player.y
+        if dx*dx + dy*dy <= radius2:
+            return True
+        dx, dy = x - self.home.x, y - self.home.y
+        return dx*dx + dy*dy <= radius2
 
     def add_enemy(self, enemy: Enemy) -> None:
         """
         Add a new enemy into the current game
         """
-        self.enemies.append(enemy)
         self.add_element(enemy)
 
+    def tick(self) -> None:
+        self.flow_field.retarget(self.player.x, self.player.y)
+        super().tick()
+        if self.batch is not None and self.is_started:
+            self.batch.step(self.player.x, self.player.y, self.home.x, self.home.y,
+                            self.flow_field, self.ticks, self.LOD_RADIUS,
+                            self.LOD_INTERVAL, order=self.entities.index)
+        if self.is_started:
+            self.detect_collisions()
+
+    def detect_collisions(self) -> None:
+        """
+        Rebuild the spatial index from the boxes swept by home, enemies and
+        bullets during the tick, then end the game if the player, along its
+        own path, has arrived home or is hit, whichever happened first.
+        Testing the paths rather than the end positions keeps fast bullets
+        from jumping over the player.  Enemies moved by the batch engine are
+        tested by the engine instead.
+        """
+        index = self.spatial_index
+        index.clear()
+        candidates: list[Home | Enemy] = [self.home]
+        # bullets are enemies too
+        candidates += [enemy for enemy in self.entities.view(Enemy)
+                       if not enemy.is_batched]
+        for element in candidates:
+            x1, y1 = element.previous_position
+            x2, y2, half = element.x, element.y, element.size/2
+            if x1 > x2:
+                x1, x2 = x2, x1
+            if y1 > y2:
+                y1, y2 = y2, y1
+            index.insert(element, x1 - half, y1 - half, x2 + half, y2 + half)
+        px1, py1 = self.player.previous_position
+        px2, py2 = self.player.x, self.player.y
+        hits = []
+        for element in index.query_box(min(px1, px2), min(py1, py2),
+                                       max(px1, px2), max(py1, py2)):
+            # move the player relative to the element, whose box is then
+            # fixed around the origin
+            x1, y1 = element.previous_position
+            half = element.size/2
+            entry = segment_entry(px1 - x1, py1 - y1,
+                                  px2 - element.x, py2 - element.y,
+                                  -half, -half, half, half)
+            if entry is not None:
+                hits.append((entry, element))
+        if self.batch is not None:
+            hits += self.batch.sweep_hits(px1, py1, px2, py2)
+        if hits:
+            # arriving home wins over being hit at the same time
+            _, first = min(hits, key=lambda hit: (hit[0], hit[1] is not self.home))
+            if first is self.home:
+                self.game_over_win()
+            else:
+                self.game_over_lose()
+
     def game_over_win(self) -> None:
         """
         Called when the player wins the game and stop the game
         """
         self.stop()
         if self.level != MAX_LEVEL-1:
-            self.clear_turtle()
-            self.reset_game()
-            self.level += 1
-            self.canvas.delete("all")
-            self.init_game()
+            self.next_level()
             self.start()
         else:
+            self.outcome = "win"
             font = ("Arial", 36, "bold")
-            self.canvas.create_text(self.screen_width / 2,
+            self.__message = self.track(self, self.canvas.create_text(
+                                    self.screen_width / 2,
                                     self.screen_height / 2,
                                     text="You Win",
                                     font=font,
-                                    fill="green")
+                                    fill="green"))
 
     def game_over_lose(self) -> None:
         """
         Called when the player loses the game and stop the game
         """
         self.stop()
+        self.outcome = "lose"
         font = ("Arial", 36, "bold")
-        self.canvas.create_text(self.screen_width/2,
+        self.__message = self.track(self, self.canvas.create_text(
+                                self.screen_width/2,
                                 self.screen_height/2,
                                 text="You Lose",
                                 font=font,
-                                fill="red")
+                                fill="red"))
 
-    def clear_turtle(self):
-        for ele in self.enemies:
-            ele.turtle.clear()
-        self.enemies = []
+    def snapshot(self) -> bytes:
+        """
+        Encode the whole state of the game, i.e., the level, the tick, the
+        random generator, the spawns to come and the state of every element,
+        into a compact binary blob for restore()
+        """
+        # a bullet belongs to its gun; none is left without one in a game
+        elements = [element for element in self.entities
+                    if not (isinstance(element, Bullet) and element.gun is None)]
+        indices = {element: i for i, element in enumerate(elements)}
+        records = [(self.SNAPSHOT_KINDS.index(type(element)),
+                    indices[element.gun] if isinstance(element, Bullet) else -1,
+                    element.get_state())
+                   for element in elements]
+        return SaveState(self.level, self.ticks, self.seed, self.outcome,
+                         self.random.getstate(), self.enemy_generator.pending(),
+                         records, self.enemy_generator.is_paused).to_bytes()
+
+    def restore(self, data: bytes) -> None:
+        """
+        Put the game back, between two ticks, into the state encoded by
+        snapshot().  Waypoint, home and player are updated in place, enemies
+        of the same kinds are reused with their canvas items, and bullets
+        come from the bullet pool again, so that restoring costs little
+        more than setting numbers.  A game restored to a state before its end
+        can be started again.
+        """
+        state = SaveState.from_bytes(data)
+        if self.__message is not None:
+            self.canvas.delete(self.__message)
+            self.__message = None
+        # take every enemy and bullet out of the game, keeping the enemies
+        # for reuse
+        for bullet in list(self.bullets):
+            if bullet.gun is not None:
+                bullet.gun.recycle(bullet)
+            else:
+                bullet.retire()
+        spares: dict[type, list[Enemy]] = {}
+        for enemy in list(self.enemies):
+            self.entities.remove(enemy)
+            spares.setdefault(type(enemy), []).append(enemy)
+
+        persistent = {Waypoint: self.waypoint, Home: self.home, Player: self.player}
+        elements: list[TurtleGameElement | None] = []
+        for kind, _, _ in state.records:
+            cls = self.SNAPSHOT_KINDS[kind]
+            if cls in persistent:
+                elements.append(persistent[cls])
+            elif cls is Bullet:
+                # launched by its gun below
+                elements.append(None)
+            elif spares.get(cls):
+                elements.append(spares[cls].pop(0))
+            else:
+                enemy = cls(self)
+                enemy.create()
+                elements.append(enemy)
+        # put the elements back in their order, so that the restored game
+        # goes on exactly like the saved one
+        for i, (_, owner, values) in enumerate(state.records):
+            element = elements[i]
+            if element is None:
+                element = elements[owner].launch_bullet(*values[:3])
+                if element is None:
+                    continue
+            elif element not in self.entities:
+                self.entities.add(element)
+            element.set_state(values)
+            element.save_state()
+        for enemies in spares.values():
+            for enemy in enemies:
+                self.delete_element(enemy)
+
+        self.enemy_generator.stop()
+        self.level = state.level
+        self.__start_spawning(EnemyGenerator(self, level=self.level),
+                              state.spawns, state.paused)
+        self.ticks = state.ticks
+        self.seed = state.seed
+        self.outcome = state.outcome
+        # creating enemies above may have drawn random numbers
+        self.random.setstate(state.random_state)
+
+    def reset_game(self) -> None:
+        # guns give their bullets back to the pool when deleted, so the pool
+        # has to be emptied after the enemies and before it is replaced
+        self.stop()
+        self.clear_enemies()
+        for bullet in self.bullet_pool.drain():
+            bullet.delete()
+            self.free(bullet)
+        self.bullet_pool = Pool(lambda: Bullet(self),
+                                capacity=self.BULLET_POOL_CAPACITY)
+        super().reset_game()
+
+    def clear_enemies(self) -> None:
+        """
+        Remove all enemies, along with their bullets, from the game
+        """
+        for enemy in list(self.enemies):
+            self.delete_element(enemy)